@@ -0,0 +1,120 @@
+"""
+Compare requests/sec of the pure ASGI AuthorizeRequestMiddleware against
+the previous BaseHTTPMiddleware implementation.
+
+Run from the server directory:
+
+    python -m benchmarks.auth_middleware --requests 20000 --concurrency 50
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+from jose import JWTError
+from starlette import status
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, Response
+from starlette.routing import Route
+
+
+def build_legacy_middleware(decode_token):
+    class LegacyAuthorizeRequestMiddleware(BaseHTTPMiddleware):
+        """The BaseHTTPMiddleware implementation this benchmark replaces."""
+
+        async def dispatch(
+            self, request: Request, call_next: RequestResponseEndpoint
+        ) -> Response:
+            exact_paths = [
+                "/docs",
+                "/openapi.json",
+                "/auth/signup",
+                "/auth/signin",
+                "/"
+            ]
+            prefix_paths = [
+                "/uploads/"
+            ]
+            if request.url.path in exact_paths:
+                return await call_next(request)
+            if any(request.url.path.startswith(prefix) for prefix in prefix_paths):
+                return await call_next(request)
+            if request.method == "OPTIONS":
+                return await call_next(request)
+
+            bearer_token = request.headers.get("Authorization")
+            if not bearer_token:
+                return JSONResponse(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    content={"detail": "Missing access token"},
+                )
+            try:
+                auth_token = bearer_token.split(" ")[1].strip()
+                token_payload = decode_token(auth_token)
+            except JWTError as error:
+                return JSONResponse(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    content={"detail": str(error)},
+                )
+            else:
+                request.state.user_id = token_payload["sub"]
+            return await call_next(request)
+
+    return LegacyAuthorizeRequestMiddleware
+
+
+async def endpoint(request: Request):
+    return PlainTextResponse(request.state.user_id)
+
+
+def build_app(middleware_class) -> Starlette:
+    app = Starlette(routes=[Route("/expenses/me", endpoint)])
+    app.add_middleware(middleware_class)
+    return app
+
+
+async def run(app, token: str, total: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    headers = {"Authorization": f"Bearer {token}"}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        remaining = total
+
+        async def worker():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                response = await client.get("/expenses/me", headers=headers)
+                assert response.status_code == 200, response.text
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return total / (time.perf_counter() - started)
+
+
+async def main(args):
+    from middleware.auth_middleware import AuthorizeRequestMiddleware
+    from utils.auth import create_access_token, decode_token
+
+    token = create_access_token({"sub": "0" * 24})
+    candidates = {
+        "BaseHTTPMiddleware": build_app(build_legacy_middleware(decode_token)),
+        "pure ASGI": build_app(AuthorizeRequestMiddleware),
+    }
+
+    results = {}
+    for name, app in candidates.items():
+        await run(app, token, min(args.requests, 500), args.concurrency)  # warm up
+        results[name] = await run(app, token, args.requests, args.concurrency)
+
+    baseline = results["BaseHTTPMiddleware"]
+    for name, rps in results.items():
+        print(f"{name:>20}: {rps:10.0f} req/s  ({rps / baseline:.2f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
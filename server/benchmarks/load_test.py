@@ -0,0 +1,317 @@
+"""
+Load test for the API: boots main.app in-process against a seeded MongoDB
+stand-in and drives the real endpoints, reporting throughput and latency
+percentiles per scenario.
+
+Run from the server directory:
+
+    # mongomock-motor (pip install -r benchmarks/requirements.txt)
+    python -m benchmarks.load_test --accounts 20 --expenses 2000
+
+    # a local mongod; the benchmark database is dropped first
+    python -m benchmarks.load_test --mongo-uri mongodb://localhost:27017
+
+    # record a baseline, then flag regressions against it
+    python -m benchmarks.load_test --save-baseline
+    python -m benchmarks.load_test --baseline benchmarks/baseline.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+PASSWORD = "Benchmark@123"
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+DESCRIPTIONS = ["Ăn sáng", "Cà phê sữa đá", "Đổ xăng", "Tiền điện", "Đi chợ", "Ăn trưa văn phòng", "Mua sách"]
+SEARCHES = ["an sang", "ca phe", "xang", "dien", "\"an trua\""]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="API load test and benchmark")
+    parser.add_argument("--mongo-uri", help="run against this mongod instead of mongomock-motor")
+    parser.add_argument("--db-name", default="expense_benchmark")
+    parser.add_argument("--accounts", type=int, default=10)
+    parser.add_argument("--tags", type=int, default=8, help="tags per account")
+    parser.add_argument("--expenses", type=int, default=1000, help="expenses per account")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=1802)
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--baseline", help="compare against this JSON report")
+    parser.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE, help="write the report as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed relative regression")
+    return parser.parse_args()
+
+
+def configure_environment(args):
+    """Settings are read at import time, so this must run before importing the app"""
+    os.environ["DB_NAME"] = args.db_name
+    os.environ["REVOCATION_BACKEND"] = "memory"
+    if args.mongo_uri:
+        os.environ["MONGO_URI"] = args.mongo_uri
+
+
+def patch_mongomock_bulk_write():
+    """
+    mongomock cannot build bulk operations from pymongo >= 4.9 request
+    objects, so apply them one at a time. Only used with the stand-in.
+    """
+    import mongomock.collection
+    from pymongo import DeleteOne, InsertOne, ReplaceOne, UpdateOne
+
+    def bulk_write(self, requests, ordered=True, **kwargs):
+        for request in requests:
+            if isinstance(request, UpdateOne):
+                self.update_one(request._filter, request._doc, upsert=request._upsert)
+            elif isinstance(request, ReplaceOne):
+                self.replace_one(request._filter, request._doc, upsert=request._upsert)
+            elif isinstance(request, DeleteOne):
+                self.delete_one(request._filter)
+            elif isinstance(request, InsertOne):
+                self.insert_one(request._doc)
+            else:
+                raise NotImplementedError(type(request).__name__)
+
+    mongomock.collection.Collection.bulk_write = bulk_write
+
+
+def install_database(args):
+    """Serve configs.database.db from the benchmark database"""
+    from configs.database import db, mongo
+
+    if args.mongo_uri:
+        return db
+
+    from mongomock_motor import AsyncMongoMockClient
+
+    patch_mongomock_bulk_write()
+    mongo.use(AsyncMongoMockClient()[args.db_name])
+    return db
+
+
+async def seed(db, args, rng):
+    from configs.indexes import ensure_indexes
+    from utils.auth import hash_password
+    from utils.rollups import rebuild
+    from utils.search import search_fields
+
+    for collection in ("accounts", "tags", "expenses", "monthly_rollups"):
+        await db[collection].delete_many({})
+    if args.mongo_uri:
+        await ensure_indexes(db)
+
+    hashed = hash_password(PASSWORD)
+    now = datetime.now(timezone.utc)
+    accounts = [
+        {
+            "email": f"bench{i}@example.com",
+            "name": f"Benchmark {i}",
+            "password": hashed,
+            "role": "user",
+            "is_active": True,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(args.accounts)
+    ]
+    await db.accounts.insert_many(accounts)
+
+    for account in accounts:
+        account_id = str(account["_id"])
+        tags = [
+            {"name": f"Tag {t}", "account_id": account_id, "created_at": now, "updated_at": now, "deleted": False}
+            for t in range(args.tags)
+        ]
+        await db.tags.insert_many(tags)
+        tag_ids = [str(tag["_id"]) for tag in tags]
+        expenses = []
+        for e in range(args.expenses):
+            desc = f"{rng.choice(DESCRIPTIONS)} {e}"
+            tag = rng.choice(tags)
+            expenses.append({
+                "amount": float(rng.randrange(10_000, 500_000, 1000)),
+                "desc": desc,
+                "deleted": False,
+                "expense_date": now - timedelta(days=rng.randrange(0, 3 * 365), seconds=rng.randrange(86400)),
+                "account_id": account_id,
+                "tagId": str(tag["_id"]),
+                **search_fields(desc, tag["name"]),
+            })
+        for start in range(0, len(expenses), 5000):
+            await db.expenses.insert_many(expenses[start:start + 5000])
+        account["tag_ids"] = tag_ids
+
+    await rebuild()
+    return accounts
+
+
+def summarize(name, latencies, errors, elapsed):
+    ordered = sorted(latencies)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000 if ordered else 0.0
+    return {
+        "scenario": name,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "mean_ms": sum(ordered) / len(ordered) * 1000 if ordered else 0.0,
+        "p50_ms": pick(0.50),
+        "p90_ms": pick(0.90),
+        "p99_ms": pick(0.99),
+    }
+
+
+async def run_scenario(name, make_request, total, concurrency):
+    latencies = []
+    errors = 0
+    issued = 0
+
+    async def worker():
+        nonlocal issued, errors
+        while issued < total:
+            index = issued
+            issued += 1
+            started = time.perf_counter()
+            response = await make_request(index)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(name, latencies, errors, time.perf_counter() - started)
+
+
+async def drive(app, accounts, args, rng):
+    import httpx
+
+    results = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        # tokens[i] belongs to accounts[i], whatever order the signins finish in
+        tokens = [None] * len(accounts)
+
+        async def signin(index):
+            account = accounts[index % len(accounts)]
+            response = await client.post("/auth/signin", json={"email": account["email"], "password": PASSWORD})
+            if response.status_code == 200:
+                tokens[index % len(accounts)] = response.json()["access_token"]
+            return response
+
+        # bcrypt dominates signin, so it gets a smaller share of requests
+        results.append(await run_scenario("signin", signin, max(len(accounts), args.requests // 10), args.concurrency))
+        if None in tokens:
+            raise SystemExit(f"signin failed for {tokens.count(None)} of {len(accounts)} benchmark accounts")
+        headers = [{"Authorization": f"Bearer {token}"} for token in tokens]
+
+        async def list_me(index):
+            return await client.get("/expenses/me", headers=headers[index % len(headers)])
+
+        async def search(index):
+            params = {"q": SEARCHES[index % len(SEARCHES)]}
+            return await client.get("/expenses/me/search", params=params, headers=headers[index % len(headers)])
+
+        async def monthly_summary(index):
+            return await client.get("/expenses/me/monthly-summary", headers=headers[index % len(headers)])
+
+        created = []
+
+        def expense_body(owner):
+            return {
+                "amount": float(rng.randrange(10_000, 500_000, 1000)),
+                "desc": "Benchmark",
+                "expense_date": (datetime.now(timezone.utc) - timedelta(days=rng.randrange(365))).isoformat(),
+                "tagId": rng.choice(accounts[owner]["tag_ids"]),
+            }
+
+        async def create(index):
+            owner = index % len(accounts)
+            response = await client.post("/expenses/", json=expense_body(owner), headers=headers[owner])
+            if response.status_code == 201:
+                created.append((owner, response.json()["_id"]))
+            return response
+
+        async def update(index):
+            owner, expense_id = created[index % len(created)]
+            return await client.put(f"/expenses/{expense_id}", json=expense_body(owner), headers=headers[owner])
+
+        async def delete(index):
+            owner, expense_id = created[index]
+            return await client.delete(f"/expenses/{expense_id}", headers=headers[owner])
+
+        results.append(await run_scenario("list_me", list_me, args.requests, args.concurrency))
+        results.append(await run_scenario("monthly_summary", monthly_summary, args.requests, args.concurrency))
+        if args.mongo_uri:
+            # mongomock has no $text support
+            results.append(await run_scenario("search", search, args.requests, args.concurrency))
+        results.append(await run_scenario("create_expense", create, args.requests, args.concurrency))
+        if created:
+            results.append(await run_scenario("update_expense", update, args.requests, args.concurrency))
+            results.append(await run_scenario("delete_expense", delete, len(created), args.concurrency))
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Return a description of every scenario that regressed beyond `threshold`"""
+    previous = {row["scenario"]: row for row in baseline["results"]}
+    regressions = []
+    for row in results:
+        before = previous.get(row["scenario"])
+        if not before:
+            continue
+        if row["rps"] < before["rps"] * (1 - threshold):
+            regressions.append(f"{row['scenario']}: throughput {before['rps']:.0f} -> {row['rps']:.0f} req/s")
+        if row["p99_ms"] > before["p99_ms"] * (1 + threshold):
+            regressions.append(f"{row['scenario']}: p99 {before['p99_ms']:.1f} -> {row['p99_ms']:.1f} ms")
+    return regressions
+
+
+def print_report(results):
+    print(f"{'scenario':<16}{'requests':>9}{'errors':>8}{'req/s':>10}{'mean ms':>10}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}")
+    for row in results:
+        print(
+            f"{row['scenario']:<16}{row['requests']:>9}{row['errors']:>8}{row['rps']:>10.0f}"
+            f"{row['mean_ms']:>10.1f}{row['p50_ms']:>10.1f}{row['p90_ms']:>10.1f}{row['p99_ms']:>10.1f}"
+        )
+
+
+async def main(args, app, db) -> int:
+    rng = random.Random(args.seed)
+    accounts = await seed(db, args, rng)
+    results = await drive(app, accounts, args, rng)
+    print_report(results)
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "backend": "mongod" if args.mongo_uri else "mongomock",
+        "scale": {"accounts": args.accounts, "tags": args.tags, "expenses": args.expenses},
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "results": results,
+    }
+    for path in filter(None, [args.output, args.save_baseline]):
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {path}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for regression in regressions:
+            print(f"❌ {regression}")
+        if regressions:
+            return 1
+        print(f"✅ No regression beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    configure_environment(args)
+    # httpx's ASGITransport does not run the lifespan, so the app never
+    # connects to the real MONGO_URI; seed() creates indexes on a real mongod
+    from main import app
+    sys.exit(asyncio.run(main(args, app, install_database(args))))
@@ -0,0 +1,133 @@
+"""
+Compare serialization throughput of a page of expenses: the previous
+response_model path (pydantic validation + jsonable_encoder + stdlib json),
+the same path rendered with ORJSONResponse, and the pre-built orjson path
+in utils.serialization.
+
+Run from the server directory:
+
+    python -m benchmarks.serialization --rows 1000 --iterations 200
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+import orjson
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from models.expense import ExpenseResponse
+from utils.serialization import dump_expenses
+
+page_adapter = TypeAdapter(List[ExpenseResponse])
+
+
+def build_page(rows: int) -> list:
+    account_id = str(ObjectId())
+    now = datetime.now()
+    tags = [
+        {
+            "_id": ObjectId(),
+            "name": f"Tag {i}",
+            "account_id": account_id,
+            "created_at": now,
+            "updated_at": now,
+            "deleted": False,
+            "color": "#FF0000",
+        }
+        for i in range(5)
+    ] + [
+        # As stored by POST /tags/: no timestamps, deleted flag or color
+        {"_id": ObjectId(), "name": f"Tag {i}", "account_id": account_id}
+        for i in range(5, 10)
+    ]
+    return [
+        {
+            "_id": ObjectId(),
+            "account_id": account_id,
+            "amount": random.randint(1001, 5_000_000),
+            "desc": f"Expense number {i}",
+            "deleted": False,
+            "expense_date": now - timedelta(minutes=i),
+            "created_at": now,
+            "updated_at": now,
+            "tag": random.choice(tags + [None]),
+        }
+        for i in range(rows)
+    ]
+
+
+def comparable(body: bytes, page: list) -> list:
+    """
+    The decoded body with the tag timestamps that both paths fill in with
+    datetime.now() removed, after checking they are present
+    """
+    rows = orjson.loads(body)
+    for row, expense in zip(rows, page):
+        tag = expense["tag"]
+        for field in ("created_at", "updated_at"):
+            if tag is not None and field not in tag:
+                assert row["tag"].pop(field) is not None
+    return rows
+
+
+def response_model_json(page: list) -> bytes:
+    content = jsonable_encoder(page_adapter.validate_python(page))
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def response_model_orjson(page: list) -> bytes:
+    return orjson.dumps(jsonable_encoder(page_adapter.validate_python(page)))
+
+
+def prebuilt_orjson(page: list) -> bytes:
+    return dump_expenses(page)
+
+
+def measure(serialize, page: list, iterations: int) -> dict:
+    body = serialize(page)
+    started = time.perf_counter()
+    for _ in range(iterations):
+        serialize(page)
+    elapsed = time.perf_counter() - started
+    return {
+        "bytes": len(body),
+        "ms_per_page": elapsed / iterations * 1000,
+        "mb_per_second": len(body) * iterations / elapsed / 1_000_000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    page = build_page(args.rows)
+
+    # The fast path must produce the same document as the response_model path
+    assert comparable(prebuilt_orjson(page), page) == comparable(response_model_json(page), page)
+
+    variants = [
+        ("response_model + json", response_model_json),
+        ("response_model + orjson", response_model_orjson),
+        ("pre-built orjson", prebuilt_orjson),
+    ]
+    baseline = None
+    print(f"{args.rows} rows, {args.iterations} iterations")
+    print(f"{'path':<26}{'bytes':>10}{'ms/page':>10}{'MB/s':>10}{'speedup':>10}")
+    for name, serialize in variants:
+        result = measure(serialize, page, args.iterations)
+        baseline = baseline or result["ms_per_page"]
+        print(
+            f"{name:<26}{result['bytes']:>10}{result['ms_per_page']:>10.2f}"
+            f"{result['mb_per_second']:>10.1f}{baseline / result['ms_per_page']:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
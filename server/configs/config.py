@@ -5,17 +5,79 @@ class Settings(BaseSettings):
     # MongoDB Configuration
     MONGO_URI: str = os.getenv("MONGO_URI", "mongodb://localhost:27017")
     DB_NAME: str = os.getenv("DB_NAME", "expense_db")
+
+    # MongoDB Connection Pool (timeouts in milliseconds, 0 = no timeout)
+    MONGO_MAX_POOL_SIZE: int = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
+    MONGO_MIN_POOL_SIZE: int = int(os.getenv("MONGO_MIN_POOL_SIZE", "10"))
+    MONGO_MAX_IDLE_TIME_MS: int = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "300000"))
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: int = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "5000"))
+    MONGO_CONNECT_TIMEOUT_MS: int = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000"))
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+    MONGO_SOCKET_TIMEOUT_MS: int = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "0"))
+    # Wire compression, e.g. "zstd,snappy,zlib" (zstd needs pymongo[zstd], snappy pymongo[snappy])
+    MONGO_COMPRESSORS: str = os.getenv("MONGO_COMPRESSORS", "")
+    # Connections opened at startup before the server reports ready
+    MONGO_WARMUP_CONNECTIONS: int = int(os.getenv("MONGO_WARMUP_CONNECTIONS", os.getenv("MONGO_MIN_POOL_SIZE", "10")))
+    # A failed startup (ping, indexes, warm-up) is retried in the background with
+    # exponential backoff; MONGO_START_RETRY=false makes the app fail to start instead
+    MONGO_START_RETRY: bool = os.getenv("MONGO_START_RETRY", "true").lower() == "true"
+    MONGO_START_RETRY_SECONDS: float = float(os.getenv("MONGO_START_RETRY_SECONDS", "1"))
+    MONGO_START_RETRY_MAX_SECONDS: float = float(os.getenv("MONGO_START_RETRY_MAX_SECONDS", "30"))
     
+    # Server / Launcher Configuration (WEB_WORKERS=0 sizes workers from the CPUs available)
+    WEB_HOST: str = os.getenv("WEB_HOST", "0.0.0.0")
+    WEB_PORT: int = int(os.getenv("WEB_PORT", "8000"))
+    WEB_SERVER: str = os.getenv("WEB_SERVER", "uvicorn")
+    WEB_WORKERS: int = int(os.getenv("WEB_WORKERS", "0"))
+    WEB_MAX_REQUESTS: int = int(os.getenv("WEB_MAX_REQUESTS", "10000"))
+    WEB_MAX_REQUESTS_JITTER: int = int(os.getenv("WEB_MAX_REQUESTS_JITTER", "1000"))
+    WEB_GRACEFUL_TIMEOUT: int = int(os.getenv("WEB_GRACEFUL_TIMEOUT", "30"))
+    WEB_KEEPALIVE: int = int(os.getenv("WEB_KEEPALIVE", "5"))
+    WEB_BACKLOG: int = int(os.getenv("WEB_BACKLOG", "2048"))
+    WEB_PRELOAD: bool = os.getenv("WEB_PRELOAD", "true").lower() == "true"
+    FORWARDED_ALLOW_IPS: str = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+
     # JWT Configuration
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-here")
     ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
     REFRESH_TOKEN_EXPIRE_DAYS: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
 
+    # Token Revocation Configuration ("memory" or "mongo")
+    REVOCATION_BACKEND: str = os.getenv("REVOCATION_BACKEND", "memory")
+    REVOCATION_SYNC_SECONDS: float = float(os.getenv("REVOCATION_SYNC_SECONDS", "5"))
+    REVOCATION_BLOOM_CAPACITY: int = int(os.getenv("REVOCATION_BLOOM_CAPACITY", "100000"))
+
+    # Slow Query Log Configuration
+    SLOW_QUERY_MS: float = float(os.getenv("SLOW_QUERY_MS", "100"))
+    SLOW_QUERY_SAMPLE_RATE: float = float(os.getenv("SLOW_QUERY_SAMPLE_RATE", "1.0"))
+    SLOW_QUERY_MAX_PER_MINUTE: int = int(os.getenv("SLOW_QUERY_MAX_PER_MINUTE", "30"))
+    SLOW_QUERY_EXPLAIN: bool = os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() == "true"
+
     # CORS Configuration
     CORS_ORIGINS: str = os.getenv("CORS_ORIGINS", "*")
     CORS_METHODS: str = os.getenv("CORS_METHODS", "GET,POST,PUT,DELETE,OPTIONS")
     CORS_HEADERS: str = os.getenv("CORS_HEADERS", "Content-Type,Authorization")
+
+    # Response Cache for aggregate endpoints ("memory", "mongo" to share between workers, or "none")
+    RESPONSE_CACHE_BACKEND: str = os.getenv("RESPONSE_CACHE_BACKEND", "memory")
+    RESPONSE_CACHE_MAX_BYTES: int = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    RESPONSE_CACHE_TTL_SECONDS: float = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "300"))
+
+    # Password Hashing Configuration
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+    PASSWORD_HASH_MAX_QUEUE: int = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64"))
+
+    # Upload Configuration
+    AVATAR_MAX_BYTES: int = int(os.getenv("AVATAR_MAX_BYTES", str(5 * 1024 * 1024)))
+
+    # Cache Configuration
+    TAG_CACHE_SIZE: int = int(os.getenv("TAG_CACHE_SIZE", "10000"))
+    TAG_CACHE_TTL_SECONDS: int = int(os.getenv("TAG_CACHE_TTL_SECONDS", "300"))
+    ACCOUNT_CACHE_SIZE: int = int(os.getenv("ACCOUNT_CACHE_SIZE", "10000"))
+    ACCOUNT_CACHE_TTL_SECONDS: int = int(os.getenv("ACCOUNT_CACHE_TTL_SECONDS", "30"))
+    TOKEN_CACHE_SIZE: int = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+    TOKEN_CACHE_TTL_SECONDS: int = int(os.getenv("TOKEN_CACHE_TTL_SECONDS", "300"))
     
     class Config:
         env_file = ".env"
@@ -1,21 +1,183 @@
 import asyncio
-from motor.motor_asyncio import AsyncIOMotorClient
+import logging
+import os
+import time
+from typing import Awaitable, Callable, Optional, Sequence
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 from configs.config import settings
+from configs.indexes import ensure_indexes
+from utils.metrics import MongoCommandMetrics, MongoPoolMetrics
+from utils.slow_queries import SlowQueryRecorder
+
+logger = logging.getLogger(__name__)
 
 MONGO_URI = settings.MONGO_URI
 DB_NAME = settings.DB_NAME
 
-client = AsyncIOMotorClient(MONGO_URI)
-db = client.get_database(DB_NAME)  
+# Records slow router queries for /admin/slow-queries
+slow_query_recorder = SlowQueryRecorder(
+    threshold_ms=settings.SLOW_QUERY_MS,
+    sample_rate=settings.SLOW_QUERY_SAMPLE_RATE,
+    max_per_minute=settings.SLOW_QUERY_MAX_PER_MINUTE,
+    explain=settings.SLOW_QUERY_EXPLAIN,
+)
+
+# Connection checkouts, waiters and pool size for /healthz, /readyz and /metrics
+pool_metrics = MongoPoolMetrics(max_pool_size=settings.MONGO_MAX_POOL_SIZE)
+
+
+def client_options() -> dict:
+    """Pool, timeout and compression options for AsyncIOMotorClient"""
+    options = {
+        "maxPoolSize": settings.MONGO_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": settings.MONGO_MAX_IDLE_TIME_MS,
+        "waitQueueTimeoutMS": settings.MONGO_WAIT_QUEUE_TIMEOUT_MS or None,
+        "connectTimeoutMS": settings.MONGO_CONNECT_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "socketTimeoutMS": settings.MONGO_SOCKET_TIMEOUT_MS or None,
+    }
+    if settings.MONGO_COMPRESSORS:
+        options["compressors"] = settings.MONGO_COMPRESSORS
+    return options
+
+
+class MongoConnection:
+    """
+    Owns the Motor client. The app lifespan opens it, warms the pool and
+    ensures indexes before traffic is accepted, and closes it on shutdown.
+    Backfills passed to `start` run after that, before the app reports ready.
+    If MongoDB is unreachable at boot, startup is retried in the background
+    with exponential backoff and /readyz reports 503 until it succeeds.
+    Command line tools get a client lazily on first use.
+    """
+
+    def __init__(self):
+        self.client: Optional[AsyncIOMotorClient] = None
+        self.database: Optional[AsyncIOMotorDatabase] = None
+        self.ready = False
+        self.started_at: Optional[float] = None
+        self._pid: Optional[int] = None
+        self._collections = {}
+        self._retry_task: Optional[asyncio.Task] = None
+        self._backfills: Sequence[Callable[[], Awaitable]] = ()
+
+    def connect(self) -> AsyncIOMotorDatabase:
+        # MongoClient is not fork-safe: a worker forked from a preloading
+        # master builds its own client instead of inheriting the parent's
+        if self.database is None or (self.client is not None and self._pid != os.getpid()):
+            # Command monitoring feeds the /metrics endpoint, Server-Timing headers and the slow-query log
+            self.client = AsyncIOMotorClient(
+                MONGO_URI,
+                event_listeners=[MongoCommandMetrics(), slow_query_recorder, pool_metrics],
+                **client_options(),
+            )
+            self.database = self.client.get_database(DB_NAME)
+            self._pid = os.getpid()
+            self._collections = {}
+        return self.database
+
+    def collection(self, name: str):
+        database = self.connect()
+        collection = self._collections.get(name)
+        if collection is None:
+            collection = self._collections[name] = database[name]
+        return collection
+
+    def use(self, database: AsyncIOMotorDatabase) -> None:
+        """Serve `db` from another database object, e.g. a benchmark stand-in"""
+        self.database = database
+        self._collections = {}
+
+    async def ping(self) -> bool:
+        try:
+            await self.connect().command("ping")
+            return True
+        except Exception:
+            return False
+
+    async def warm_up(self, connections: int) -> None:
+        """Open pool connections up front so the first requests don't pay for the handshakes"""
+        database = self.connect()
+        await asyncio.gather(*(database.command("ping") for _ in range(connections)))
+
+    async def _start(self) -> None:
+        database = self.connect()
+        started = time.perf_counter()
+        await database.command("ping")
+
+        # Uniqueness and query indexes from the registry
+        await ensure_indexes(database)
+        await self.warm_up(settings.MONGO_WARMUP_CONNECTIONS)
+        for backfill in self._backfills:
+            await backfill()
+
+        self.ready = True
+        self.started_at = time.time()
+        logger.info("MongoDB connected (%.0f ms warm-up)", (time.perf_counter() - started) * 1000)
+
+    async def _retry_start(self) -> None:
+        delay = settings.MONGO_START_RETRY_SECONDS
+        while not self.ready:
+            await asyncio.sleep(delay)
+            try:
+                await self._start()
+            except Exception:
+                delay = min(delay * 2, settings.MONGO_START_RETRY_MAX_SECONDS)
+                logger.warning("MongoDB startup failed, retrying in %g s", delay, exc_info=True)
+
+    async def start(self, backfills: Sequence[Callable[[], Awaitable]] = ()) -> None:
+        self._backfills = backfills
+        self.connect()
+        if self.client is not None:
+            slow_query_recorder.attach(self.client, asyncio.get_running_loop())
+        try:
+            await self._start()
+        except Exception:
+            if not settings.MONGO_START_RETRY:
+                raise
+            logger.exception("MongoDB startup failed, retrying in %g s", settings.MONGO_START_RETRY_SECONDS)
+            self._retry_task = asyncio.create_task(self._retry_start())
+
+    async def close(self) -> None:
+        self.ready = False
+        if self._retry_task is not None:
+            self._retry_task.cancel()
+            self._retry_task = None
+        if self.client is not None:
+            self.client.close()
+        self.client = None
+        self.database = None
+        self._collections = {}
+
+
+mongo = MongoConnection()
+
+
+class CollectionProxy:
+    """A collection looked up on each use, so module-level references follow reconnects and forks"""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __getattr__(self, attr: str):
+        return getattr(mongo.collection(self.name), attr)
+
+
+class DatabaseProxy:
+    """
+    Stands in for the Motor database so modules can keep doing
+    `from configs.database import db` before the lifespan has connected.
+    Database methods are forwarded; any other attribute is a collection.
+    """
+
+    def __getattr__(self, name: str):
+        if name.startswith("_") or hasattr(AsyncIOMotorDatabase, name):
+            return getattr(mongo.connect(), name)
+        return CollectionProxy(name)
 
-async def test_mongo_connection():
-    try:
-        await db.command("ping")
-        print("✅ MongoDB connected successfully.")
+    def __getitem__(self, name: str):
+        return CollectionProxy(name)
 
-        # Uniqueness index
-        await db["accounts"].create_index("email", unique=True)
-    except Exception as e:
-        print("❌ MongoDB connection failed:", e)
 
-asyncio.create_task(test_mongo_connection())
\ No newline at end of file
+db = DatabaseProxy()
@@ -0,0 +1,217 @@
+"""
+Declarative index registry for the MongoDB collections.
+
+Indexes are created idempotently at startup by `ensure_indexes`. Run
+
+    python -m configs.indexes --check
+
+to create them and then `explain()` every query and aggregation the routers
+issue, failing if any of them is not backed by an index, unless it is listed
+in COLLSCAN_ALLOWED.
+"""
+import argparse
+import asyncio
+import sys
+from datetime import datetime
+from typing import Optional
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+
+INDEXES = {
+    "accounts": [
+        IndexModel([("email", ASCENDING)], unique=True),
+    ],
+    "expenses": [
+        # Listing, date ranges and monthly summaries for one account.
+        # The trailing _id matches the (expense_date, _id) keyset order.
+        IndexModel([("account_id", ASCENDING), ("deleted", ASCENDING), ("expense_date", DESCENDING), ("_id", DESCENDING)]),
+        # Listing by tag for one account
+        IndexModel([("account_id", ASCENDING), ("tagId", ASCENDING), ("expense_date", DESCENDING), ("_id", DESCENDING)]),
+        # Listing across all accounts
+        IndexModel([("deleted", ASCENDING), ("expense_date", DESCENDING), ("_id", DESCENDING)]),
+        # Full-text search within one account over accent-folded description
+        # and tag name; no language, so Vietnamese is neither stemmed nor stop-worded
+        IndexModel(
+            [("account_id", ASCENDING), ("desc_terms", TEXT), ("tag_terms", TEXT)],
+            weights={"desc_terms": 3, "tag_terms": 1},
+            default_language="none",
+            name="expense_search",
+        ),
+    ],
+    "tags": [
+        IndexModel([("account_id", ASCENDING)]),
+    ],
+    "revoked_tokens": [
+        # Entries expire together with the token they revoke
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+    ],
+    "response_cache": [
+        # Shared response cache entries (RESPONSE_CACHE_BACKEND=mongo)
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+    ],
+    "monthly_rollups": [
+        IndexModel([("account_id", ASCENDING), ("year", ASCENDING), ("month", ASCENDING)], unique=True),
+    ],
+}
+
+_ACCOUNT_ID = "000000000000000000000000"
+_TAG_ID = "000000000000000000000001"
+_START = datetime(2024, 1, 1)
+_END = datetime(2024, 12, 31)
+
+_KEYSET = {"expense_date": -1, "_id": -1}
+_SUMMARY_MATCH = {"account_id": _ACCOUNT_ID, "deleted": False, "expense_date": {"$gte": _START, "$lte": _END}}
+
+
+def _summary(match: dict, group_id: dict, sort: dict) -> list:
+    """The pipeline of routers.expense.aggregate_expenses"""
+    return [
+        {"$match": match},
+        {"$group": {"_id": group_id, "total": {"$sum": "$amount"}, "count": {"$sum": 1}}},
+        {"$project": {"_id": 0, **{key: f"$_id.{key}" for key in group_id}, "total": 1, "count": 1}},
+        {"$sort": sort},
+    ]
+
+
+_BY_TAG = {"tag_id": "$tagId"}
+_BY_DAY = {"date": {"$dateToString": {"format": "%Y-%m-%d", "date": "$expense_date"}}}
+_BY_TAG_MONTH = {"tag_id": "$tagId", "year": {"$year": "$expense_date"}, "month": {"$month": "$expense_date"}}
+
+def _search(match: dict, after: Optional[tuple] = None) -> list:
+    """The pipeline of utils.search.search_pipeline"""
+    pipeline = [
+        {"$match": {**match, "$text": {"$search": "an sang"}}},
+        {"$addFields": {"score": {"$meta": "textScore"}}},
+    ]
+    if after:
+        score, _id = after
+        pipeline.append({"$match": {"$or": [{"score": {"$lt": score}}, {"score": score, "_id": {"$lt": _id}}]}})
+    return pipeline + [{"$sort": {"score": -1, "_id": -1}}, {"$limit": 20}]
+
+
+_AFTER = {"$or": [
+    {"expense_date": {"$lt": _END}},
+    {"expense_date": _END, "_id": {"$lt": ObjectId(_TAG_ID)}},
+]}
+
+# Representative shapes of the queries issued by the routers.
+# Each entry is (name, collection, filter, sort), or (name, collection,
+# pipeline, None) for an aggregation.
+QUERIES = [
+    ("get_all_expenses", "expenses", {"deleted": False}, _KEYSET),
+    ("get_expenses_by_account_id", "expenses",
+     {"account_id": _ACCOUNT_ID, "deleted": False}, _KEYSET),
+    ("get_expenses_by_account_id[date]", "expenses",
+     {"account_id": _ACCOUNT_ID, "deleted": False, "expense_date": {"$gte": _START, "$lte": _END}},
+     _KEYSET),
+    ("get_expenses_by_account_id[tag]", "expenses",
+     {"account_id": _ACCOUNT_ID, "deleted": False, "tagId": _TAG_ID}, _KEYSET),
+    ("get_expenses_by_account_id[cursor]", "expenses",
+     {"account_id": _ACCOUNT_ID, "deleted": False, **_AFTER}, _KEYSET),
+    ("get_expenses_by_tag", "expenses",
+     {"account_id": _ACCOUNT_ID, "tagId": _TAG_ID, "deleted": False}, _KEYSET),
+    ("export_current_user_expenses", "expenses",
+     {"account_id": _ACCOUNT_ID, "deleted": False}, _KEYSET),
+    ("export_current_user_expenses[date,tag]", "expenses",
+     {"account_id": _ACCOUNT_ID, "deleted": False, "expense_date": {"$gte": _START, "$lte": _END}, "tagId": _TAG_ID},
+     _KEYSET),
+    ("search_expenses", "expenses", _search({"account_id": _ACCOUNT_ID, "deleted": False}), None),
+    ("search_expenses[date,tag,cursor]", "expenses",
+     _search({"account_id": _ACCOUNT_ID, "deleted": False, "expense_date": {"$gte": _START, "$lte": _END},
+              "tagId": _TAG_ID}, after=(1.5, ObjectId(_TAG_ID))),
+     None),
+    ("get_tag_summary", "expenses",
+     _summary({"account_id": _ACCOUNT_ID, "deleted": False}, _BY_TAG, {"total": -1}), None),
+    ("get_tag_summary[date,tag]", "expenses",
+     _summary({**_SUMMARY_MATCH, "tagId": _TAG_ID}, _BY_TAG, {"total": -1}), None),
+    ("get_daily_summary[date]", "expenses",
+     _summary(_SUMMARY_MATCH, _BY_DAY, {"date": 1}), None),
+    ("get_tag_monthly_summary[date]", "expenses",
+     _summary(_SUMMARY_MATCH, _BY_TAG_MONTH, {"year": 1, "month": 1, "total": -1}), None),
+    ("get_all_tags", "tags", {}, None),
+    ("get_account_tags", "tags", {"account_id": _ACCOUNT_ID}, None),
+    ("update_tag[refresh_tag_terms]", "expenses", {"account_id": _ACCOUNT_ID, "tagId": _TAG_ID}, None),
+    ("get_monthly_summary", "monthly_rollups",
+     {"account_id": _ACCOUNT_ID, "count": {"$gt": 0}}, {"year": 1, "month": 1}),
+    ("get_monthly_summary[year]", "monthly_rollups",
+     {"account_id": _ACCOUNT_ID, "count": {"$gt": 0}, "year": 2024}, {"year": 1, "month": 1}),
+    ("list_accounts", "accounts", {}, None),
+    ("list_accounts[name]", "accounts", {"name": {"$regex": "someone", "$options": "i"}}, None),
+    ("signin", "accounts", {"email": "someone@example.com"}, None),
+]
+
+# Queries that scan their collection by design; --check reports them
+# without failing
+COLLSCAN_ALLOWED = {
+    # Unfiltered listings, capped by their page size
+    "get_all_tags",
+    "list_accounts",
+    # A case-insensitive substring match cannot use an index on name
+    "list_accounts[name]",
+}
+
+
+async def ensure_indexes(db) -> None:
+    """Create every registered index. Existing identical indexes are left alone."""
+    for collection, indexes in INDEXES.items():
+        await db[collection].create_indexes(indexes)
+
+
+def plan_stages(plan: dict):
+    yield plan.get("stage")
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            yield from plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from plan_stages(child)
+
+
+def _query_planner(explain: dict) -> dict:
+    # An aggregation reports its query under the leading $cursor stage
+    # unless the whole pipeline was pushed down to the query layer
+    if "queryPlanner" in explain:
+        return explain["queryPlanner"]
+    return explain["stages"][0]["$cursor"]["queryPlanner"]
+
+
+async def check_indexes(db) -> list:
+    """Return the names of registered queries whose winning plan is an unexpected COLLSCAN."""
+    unindexed = []
+    for name, collection, query, sort in QUERIES:
+        if isinstance(query, list):
+            command = {"aggregate": collection, "pipeline": query, "cursor": {}}
+        else:
+            command = {"find": collection, "filter": query}
+            if sort:
+                command["sort"] = sort
+        explain = await db.command({"explain": command, "verbosity": "queryPlanner"})
+        stages = set(plan_stages(_query_planner(explain)["winningPlan"]))
+        if "COLLSCAN" not in stages:
+            status = "indexed"
+        elif name in COLLSCAN_ALLOWED:
+            status = "allowed"
+        else:
+            status = "COLLSCAN"
+            unindexed.append(name)
+        print(f"{status:>8}  {name}")
+    return unindexed
+
+
+async def main(check: bool) -> int:
+    from configs.database import db
+
+    await ensure_indexes(db)
+    if not check:
+        return 0
+    unindexed = await check_indexes(db)
+    if unindexed:
+        print(f"❌ {len(unindexed)} quer{'y is' if len(unindexed) == 1 else 'ies are'} not index-backed: {', '.join(unindexed)}")
+        return 1
+    print(f"✅ All router queries are index-backed, apart from {len(COLLSCAN_ALLOWED)} allowed scans.")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create and verify MongoDB indexes")
+    parser.add_argument("--check", action="store_true", help="explain() every router query and fail on COLLSCAN")
+    sys.exit(asyncio.run(main(parser.parse_args().check)))
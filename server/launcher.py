@@ -0,0 +1,162 @@
+"""
+Production entry point: runs main:app on every available core.
+
+    python launcher.py                       # uvicorn supervisor, WEB_* settings
+    python launcher.py --server gunicorn     # gunicorn master with uvicorn workers
+    python launcher.py --workers 4 --port 8080
+
+`uvicorn main:app --reload` is still the way to run a development server.
+
+Each worker is a separate process with its own Mongo pool, caches and
+password hashing threads. Token revocation must then be shared through
+MongoDB, so the in-memory backend is replaced (with a warning) when more
+than one worker runs. With several workers they are recycled after
+WEB_MAX_REQUESTS requests (with up to WEB_MAX_REQUESTS_JITTER extra under
+gunicorn so they don't all restart at once); a single uvicorn worker has no
+supervisor to restart it, so it is never recycled. Workers get
+WEB_GRACEFUL_TIMEOUT seconds to drain on shutdown, after which the lifespan
+closes the Mongo client.
+"""
+import argparse
+import importlib.util
+import logging
+import math
+import os
+import sys
+
+# Relative paths (uploads/, main:app) resolve against the server directory
+# in the supervisor and every worker, wherever the launcher is started from
+SERVER_DIR = os.path.dirname(os.path.abspath(__file__))
+os.chdir(SERVER_DIR)
+sys.path.insert(0, SERVER_DIR)
+
+from configs.config import settings  # noqa: E402
+
+logger = logging.getLogger("launcher")
+
+APP = "main:app"
+
+
+def available_cpus() -> int:
+    """CPUs this process may use: affinity mask, capped by a cgroup v2 quota"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+def worker_count(requested: int) -> int:
+    # The app is async and bcrypt runs on its own threads, so one worker per core
+    return requested if requested > 0 else available_cpus()
+
+
+def event_loop() -> str:
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+
+def http_protocol() -> str:
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+
+def share_revocations(workers: int) -> None:
+    """A token revoked in one worker must be rejected by all of them"""
+    if workers > 1 and settings.REVOCATION_BACKEND == "memory":
+        logger.warning(
+            "%d workers: using REVOCATION_BACKEND=mongo instead of memory so signouts apply to every worker",
+            workers,
+        )
+        # Inherited by spawned workers; the attribute covers modules preloaded in this process
+        os.environ["REVOCATION_BACKEND"] = "mongo"
+        settings.REVOCATION_BACKEND = "mongo"
+
+
+def run_uvicorn(args, workers: int) -> None:
+    import uvicorn
+
+    if args.preload:
+        # uvicorn spawns its workers, so this cannot share memory with them,
+        # but a broken import fails here once instead of in a worker restart loop
+        importlib.import_module(APP.split(":")[0])
+
+    uvicorn.run(
+        APP,
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        loop=event_loop(),
+        http=http_protocol(),
+        lifespan="on",
+        backlog=settings.WEB_BACKLOG,
+        timeout_keep_alive=settings.WEB_KEEPALIVE,
+        timeout_graceful_shutdown=settings.WEB_GRACEFUL_TIMEOUT,
+        # Without the multi-worker supervisor a recycled worker is not restarted
+        limit_max_requests=(settings.WEB_MAX_REQUESTS or None) if workers > 1 else None,
+        proxy_headers=True,
+        forwarded_allow_ips=settings.FORWARDED_ALLOW_IPS,
+    )
+
+
+def run_gunicorn(args, workers: int) -> None:
+    try:
+        from gunicorn.app.base import BaseApplication
+        from uvicorn.workers import UvicornWorker
+    except ImportError as e:
+        raise SystemExit(f"--server gunicorn needs gunicorn installed ({e})")
+
+    class Worker(UvicornWorker):
+        CONFIG_KWARGS = {"loop": event_loop(), "http": http_protocol(), "lifespan": "on"}
+
+    class Application(BaseApplication):
+        def load_config(self):
+            options = {
+                "bind": f"{args.host}:{args.port}",
+                "workers": workers,
+                "worker_class": Worker,
+                "preload_app": args.preload,
+                "backlog": settings.WEB_BACKLOG,
+                "keepalive": settings.WEB_KEEPALIVE,
+                "graceful_timeout": settings.WEB_GRACEFUL_TIMEOUT,
+                "max_requests": settings.WEB_MAX_REQUESTS,
+                "max_requests_jitter": settings.WEB_MAX_REQUESTS_JITTER,
+                "forwarded_allow_ips": settings.FORWARDED_ALLOW_IPS,
+            }
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            # With preload_app the master imports the app once and workers
+            # inherit it copy-on-write; the Mongo client is created per worker
+            return importlib.import_module(APP.split(":")[0]).app
+
+    Application().run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the API with one worker per core")
+    parser.add_argument("--server", choices=("uvicorn", "gunicorn"), default=settings.WEB_SERVER)
+    parser.add_argument("--workers", type=int, default=settings.WEB_WORKERS, help="0 = one per available CPU")
+    parser.add_argument("--host", default=settings.WEB_HOST)
+    parser.add_argument("--port", type=int, default=settings.WEB_PORT)
+    parser.add_argument("--preload", action=argparse.BooleanOptionalAction, default=settings.WEB_PRELOAD)
+    args = parser.parse_args()
+
+    workers = worker_count(args.workers)
+    share_revocations(workers)
+    print(f"🚀 {args.server}: {workers} worker(s) on {args.host}:{args.port}, loop={event_loop()}, http={http_protocol()}")
+
+    if args.server == "gunicorn":
+        run_gunicorn(args, workers)
+    else:
+        run_uvicorn(args, workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,38 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 from pathlib import Path
 import os
-from routers import account, tag, expense, auth
+from routers import account, tag, expense, auth, admin, health
 from fastapi.middleware.cors import CORSMiddleware
 from configs.config import settings
+from configs.database import mongo, pool_metrics
 from middleware.auth_middleware import AuthorizeRequestMiddleware
+from middleware.metrics_middleware import MetricsMiddleware
+from utils.metrics import registry, sample_lines
+from utils.auth import account_cache, token_cache, password_hash_pool
+from utils.tags import cache_stats as tag_cache_stats
+from utils.response_cache import response_cache
+from utils.file_utils import CachedStaticFiles
+from utils.rollups import backfill as backfill_rollups
+from utils.search import backfill as backfill_search
 
 # Ensure uploads directory exists
 UPLOAD_DIR = "uploads/avatars"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Connect, ensure indexes, warm the pool and fill in derived data for
+    # existing expenses before reporting ready
+    await mongo.start(backfills=[backfill_rollups, backfill_search])
+    yield
+    await mongo.close()
+
 app = FastAPI(
-    title="Expense Tracker Backend"
+    title="Expense Tracker Backend",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -25,6 +45,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=settings.CORS_METHODS.split(','),
     allow_headers=settings.CORS_HEADERS.split(','),
+    expose_headers=["X-Next-Cursor", "Server-Timing", "ETag"],
+)
+
+# Outermost, so auth and CORS time is included in the measurements
+app.add_middleware(
+    MetricsMiddleware
 )
 
 
@@ -32,13 +58,42 @@ app.include_router(account.router)
 app.include_router(tag.router)
 app.include_router(expense.router)
 app.include_router(auth.router)
+app.include_router(admin.router)
+app.include_router(health.router)
 
 # Mount static files
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+app.mount("/uploads", CachedStaticFiles(directory="uploads"), name="uploads")
 
 @app.get("/")
 async def root():
     return {
         "message": "Welcome to Expense Tracker API",
         "docs" : "http://localhost:8000/docs"   
-    }
\ No newline at end of file
+    }
+
+def collect_runtime_gauges():
+    caches = [account_cache.stats(), token_cache.stats(), *tag_cache_stats()]
+    pool = password_hash_pool.stats()
+    mongo_pool = pool_metrics.stats()
+    responses = response_cache.stats()
+    return [
+        *sample_lines("cache_hits_total", "In-process cache hits", [({"cache": c["name"]}, c["hits"]) for c in caches], "counter"),
+        *sample_lines("cache_misses_total", "In-process cache misses", [({"cache": c["name"]}, c["misses"]) for c in caches], "counter"),
+        *sample_lines("cache_entries", "In-process cache size", [({"cache": c["name"]}, c["size"]) for c in caches]),
+        *sample_lines("password_hash_queue_depth", "Password hashing calls waiting for a worker", [({}, pool["queue_depth"])]),
+        *sample_lines("password_hash_rejected_total", "Password hashing calls rejected by admission control", [({}, pool["rejected"])], "counter"),
+        *sample_lines("response_cache_lookups_total", "Aggregate response cache lookups by result", [({"result": result}, responses[result]) for result in ("hits", "misses", "coalesced")], "counter"),
+        *sample_lines("response_cache_bytes", "Bytes held by the in-process response cache", [({}, responses.get("bytes", 0))]),
+        *sample_lines("response_cache_entries", "Entries in the in-process response cache", [({}, responses.get("entries", 0))]),
+        *sample_lines("mongodb_pool_connections", "Open MongoDB connections", [({}, mongo_pool["open"])]),
+        *sample_lines("mongodb_pool_checked_out", "MongoDB connections in use", [({}, mongo_pool["checked_out"])]),
+        *sample_lines("mongodb_pool_waiting", "Requests waiting for a MongoDB connection", [({}, mongo_pool["waiting"])]),
+        *sample_lines("mongodb_pool_checkout_timeouts_total", "MongoDB connection checkouts that timed out", [({}, mongo_pool["checkout_timeouts"])], "counter"),
+    ]
+
+registry.register_collector(collect_runtime_gauges)
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics of this worker process."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
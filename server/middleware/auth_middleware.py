@@ -1,56 +1,83 @@
 from starlette import status
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
-from starlette.requests import Request
-from starlette.responses import Response, JSONResponse
-from jose import JWTError, jwt
-from configs.config import settings
-
-class AuthorizeRequestMiddleware(BaseHTTPMiddleware):
-    async def dispatch(
-        self, request: Request, call_next: RequestResponseEndpoint
-    ) -> Response:
-        # List of paths that don't require token verification
-        exact_paths = [
-            "/docs", 
-            "/openapi.json", 
-            "/auth/signup", 
-            "/auth/signin",
-            "/"
-        ]
-        
-        # Path prefixes that don't require authentication
-        prefix_paths = [
-            "/uploads/"  # This will match /uploads/anything
-        ]
-        
-        # Check if path matches any exact path
-        if request.url.path in exact_paths:
-            return await call_next(request)
-            
-        # Check if path starts with any excluded prefix
-        if any(request.url.path.startswith(prefix) for prefix in prefix_paths):
-            return await call_next(request)
-        if request.method == "OPTIONS":
-            return await call_next(request)
-
-        bearer_token = request.headers.get("Authorization")
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+from jose import JWTError
+from utils.auth import decode_token
+
+# Paths that don't require token verification
+EXACT_PATHS = frozenset({
+    "/docs",
+    "/openapi.json",
+    "/auth/signup",
+    "/auth/signin",
+    "/metrics",
+    "/healthz",
+    "/readyz",
+    "/",
+})
+
+# Path prefixes that don't require authentication
+PREFIX_PATHS = (
+    "/uploads/",  # This will match /uploads/anything
+)
+
+
+def is_public_path(path: str) -> bool:
+    return path in EXACT_PATHS or path.startswith(PREFIX_PATHS)
+
+
+class AuthorizeRequestMiddleware:
+    """
+    Pure ASGI middleware that verifies the bearer token of every request
+    outside the public paths and stores the verified payload in the request
+    state for the dependency chain.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if is_public_path(scope["path"]) or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        bearer_token = Headers(scope=scope).get("Authorization")
         if not bearer_token:
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 content={
                     "detail": "Missing access token",
                 },
             )
+            await response(scope, receive, send)
+            return
+
         try:
             auth_token = bearer_token.split(" ")[1].strip()
-            token_payload = jwt.decode(auth_token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        except (
-            JWTError,
-        ) as error:
-            return JSONResponse(
+            token_payload = decode_token(auth_token)
+        except IndexError:
+            response = JSONResponse(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                content={"detail": "Invalid authorization header"},
+            )
+            await response(scope, receive, send)
+            return
+        except JWTError as error:
+            response = JSONResponse(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 content={"detail": str(error)},
             )
-        else:
-            request.state.user_id = token_payload["sub"]
-        return await call_next(request)
\ No newline at end of file
+            await response(scope, receive, send)
+            return
+
+        # Starlette's request.state is backed by scope["state"]
+        state = scope.setdefault("state", {})
+        state["user_id"] = token_payload["sub"]
+        state["token"] = auth_token
+        state["token_payload"] = token_payload
+        await self.app(scope, receive, send)
@@ -0,0 +1,51 @@
+import time
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from utils.metrics import (
+    RequestStats,
+    current_request,
+    http_request_db_operations,
+    http_request_duration_seconds,
+    http_requests_total,
+)
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording request count, latency and the number of
+    MongoDB commands per route, and reporting them to the client in a
+    Server-Timing header.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope=scope)
+        token = current_request.set(stats)
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                elapsed_ms = (time.perf_counter() - stats.started) * 1000
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    f'app;dur={elapsed_ms:.1f}, db;dur={stats.db_seconds * 1000:.1f};desc="{stats.db_operations} ops"',
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_request.reset(token)
+            route = stats.route
+            http_requests_total.inc(stats.method, route, str(status_code))
+            http_request_duration_seconds.observe(time.perf_counter() - stats.started, stats.method, route)
+            http_request_db_operations.observe(stats.db_operations, stats.method, route)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Literal, Optional
 from models.common import PyObjectId
 from datetime import datetime
 from models.tag import Tag
@@ -47,4 +47,50 @@ class ExpenseUpdate(ExpenseBase):
                 "desc": "Ăn sáng",
                 "account_id": "string"
             }
-        }
\ No newline at end of file
+        }
+
+class ImportRowError(BaseModel):
+    row: int
+    error: str
+
+class ImportReport(BaseModel):
+    inserted: int = 0
+    failed: int = 0
+    errors: List[ImportRowError] = []
+
+class ExpensePatch(BaseModel):
+    amount: Optional[float] = Field(default=None, gt=1000, description="Amount must be greater than 1000")
+    desc: Optional[str] = Field(default=None, max_length=255)
+    expense_date: Optional[datetime] = None
+    tagId: Optional[str] = None
+    deleted: Optional[bool] = None
+
+class ExpenseBatchOperation(BaseModel):
+    op: Literal["update", "delete"]
+    id: str
+    data: Optional[ExpensePatch] = None
+
+class ExpenseBatchRequest(BaseModel):
+    operations: List[ExpenseBatchOperation] = Field(..., max_length=1000)
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "operations": [
+                    {"op": "update", "id": "string", "data": {"tagId": "string"}},
+                    {"op": "delete", "id": "string"}
+                ]
+            }
+        }
+
+class ExpenseBatchResult(BaseModel):
+    index: int
+    id: str
+    op: str
+    status: Literal["updated", "deleted", "not_found", "invalid", "error"]
+    error: Optional[str] = None
+
+class ExpenseBatchResponse(BaseModel):
+    updated: int = 0
+    deleted: int = 0
+    failed: int = 0
+    results: List[ExpenseBatchResult] = []
\ No newline at end of file
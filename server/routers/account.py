@@ -1,6 +1,5 @@
-import bcrypt
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from utils.auth import get_current_active_user
+from utils.auth import get_current_active_user, hash_password_async
 from models.account import Account
 from models.account import Account, AccountCreate
 from configs.database import db
@@ -41,7 +40,6 @@ async def create_account(account: AccountCreate):
     
     # Hash the password
     plain_password = account_dict.pop("password")  # remove  password from dict
-    hashed_password = bcrypt.hashpw(plain_password.encode('utf-8'), bcrypt.gensalt())
-    account_dict["password"] = hashed_password.decode('utf-8')  
+    account_dict["password"] = await hash_password_async(plain_password)
     
     return await insert_and_return(db.accounts, account_dict, Account)
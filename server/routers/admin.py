@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends
+from configs.database import slow_query_recorder
+from utils.auth import account_cache, get_current_admin_user, password_hash_pool, token_cache
+from utils.tags import cache_stats as tag_cache_stats
+from utils.response_cache import response_cache
+
+router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(get_current_admin_user)])
+
+@router.get("/stats")
+async def get_stats():
+    """
+    Runtime statistics of this worker process: password hashing pool
+    queue depth and latency, and in-process cache hit ratios.
+    """
+    return {
+        "password_hashing": password_hash_pool.stats(),
+        "caches": [account_cache.stats(), token_cache.stats(), *tag_cache_stats()],
+        "response_cache": response_cache.stats(),
+    }
+
+
+@router.get("/slow-queries")
+async def get_slow_queries(limit: int = 50):
+    """
+    Most recent slow MongoDB commands issued by the routers in this worker,
+    newest first, with redacted query shapes and explain summaries.
+    """
+    return {
+        "threshold_ms": slow_query_recorder.threshold_ms,
+        "dropped_by_rate_limit": slow_query_recorder.dropped,
+        "queries": slow_query_recorder.recent(limit),
+    }
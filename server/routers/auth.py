@@ -1,7 +1,6 @@
-import os
-from fastapi import APIRouter, HTTPException, Depends, status, UploadFile, File, Form
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends, status, UploadFile, File, Form
 from models.account import Account
-from utils.auth import hash_password, verify_password, create_access_token, create_refresh_token
+from utils.auth import hash_password_async, verify_password_async, create_access_token, create_refresh_token
 from models.auth import Auth, Token, TokenRefresh
 from datetime import timedelta, datetime
 from configs.database import db  
@@ -15,12 +14,14 @@ from utils.auth import (
 from bson import ObjectId
 from jose import JWTError, jwt
 from typing import Optional
-from utils.file_utils import save_upload_file
+from utils.file_utils import delete_file, generate_thumbnails, path_to_url, save_avatar
+from pymongo.errors import DuplicateKeyError
 from pydantic import EmailStr, BaseModel, ValidationError
 from datetime import timezone
 from utils.password_validation import validate_password
 from fastapi import Response
-from utils.auth import add_to_blacklist
+from fastapi.security import HTTPAuthorizationCredentials
+from utils.auth import get_token_payload, oauth2_scheme, revoke_token
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
@@ -31,6 +32,7 @@ class SignupForm(BaseModel):
 
 @router.post("/signup", status_code=status.HTTP_201_CREATED)
 async def signup(
+    background_tasks: BackgroundTasks,
     name: str = Form(...),
     email: EmailStr = Form(...),
     password: str = Form(...),
@@ -52,11 +54,12 @@ async def signup(
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    # Create account data
+    # Create account data; the id is generated up front so the avatar can be named after it
     account_data = {
+        "_id": ObjectId(),
         "email": email,
         "name": name,
-        "password": hash_password(password),
+        "password": await hash_password_async(password),
         "role": "user",
         "is_active": True,
         "created_at": datetime.now(timezone.utc),
@@ -64,68 +67,44 @@ async def signup(
     }
 
     # Handle avatar upload if provided
+    avatar_path = None
     if avatar and avatar.filename:
         try:
-            # Save the file first without the user ID
-            temp_file_path = await save_upload_file(avatar, "temp")
-            
-            # Insert the user to get the ID
-            result = await db.accounts.insert_one(account_data)
-            user_id = str(result.inserted_id)
-            
-            # Rename the file with the user ID
-            file_ext = os.path.splitext(temp_file_path)[1]
-            new_filename = f"{user_id}{file_ext}"
-            new_filepath = os.path.join(os.path.dirname(temp_file_path), new_filename)
-            os.rename(temp_file_path, new_filepath)
-            
-            # Update the user with the avatar path
-            # Convert path to URL format in a cross-platform way
-            normalized_path = os.path.normpath(new_filepath)
-            avatar_url = f"/{normalized_path.replace(os.sep, '/').lstrip('/')}"
-            await db.accounts.update_one(
-                {"_id": result.inserted_id},
-                {"$set": {"avatar": avatar_url}}
-            )
-            account_data["avatar"] = avatar_url
-            
+            avatar_path = await save_avatar(avatar, str(account_data["_id"]))
+        except HTTPException:
+            raise
         except Exception as e:
-            # Clean up if there's an error
-            if 'temp_file_path' in locals() and os.path.exists(temp_file_path):
-                os.remove(temp_file_path)
             raise HTTPException(status_code=500, detail=f"Error uploading avatar: {str(e)}")
-    else:
-        # Insert user without avatar
-        result = await db.accounts.insert_one(account_data)
-    
-    # Get the created user
-    created_user = await db.accounts.find_one({"_id": result.inserted_id})
-    created_user["id"] = str(created_user["_id"])
-    del created_user["password"]
-    del created_user["_id"]
+        account_data["avatar"] = path_to_url(avatar_path)
+
+    try:
+        await db.accounts.insert_one(account_data)
+    except Exception as e:
+        # Clean up if there's an error
+        if avatar_path:
+            delete_file(avatar_path)
+        if isinstance(e, DuplicateKeyError):
+            raise HTTPException(status_code=400, detail="Email already registered")
+        raise
+
+    if avatar_path:
+        background_tasks.add_task(generate_thumbnails, avatar_path)
     
     return {"message": "Successfully signed up"}
 
 @router.post("/signout")
 async def signout(
     response: Response,
-    current_user: dict = Depends(get_current_active_user)
+    credentials: HTTPAuthorizationCredentials = Depends(oauth2_scheme),
+    payload: dict = Depends(get_token_payload),
+    current_user: Account = Depends(get_current_active_user)
 ):
     """
-    Sign out the current user by adding their token to the blacklist
+    Sign out the current user by revoking their access token
     and clearing the auth cookies
     """
-    # Get the token from the Authorization header
-    from fastapi import Request
-    from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-    
-    credentials = HTTPBearer()
-    try:
-        # Extract the token from the Authorization header
-        token = credentials.credentials
-        add_to_blacklist(token)
-    except Exception:
-        pass  # If token extraction fails, we still want to clear cookies
+    # Revoke the bearer token until it expires
+    await revoke_token(credentials.credentials, payload)
     
     # Clear the cookies
     response.delete_cookie("access_token")
@@ -140,7 +119,7 @@ async def signin(auth: Auth):
     if not account:
         raise HTTPException(status_code=400, detail="Invalid email")
     
-    if not verify_password(auth.password, account["password"]):
+    if not await verify_password_async(auth.password, account["password"]):
         raise HTTPException(status_code=400, detail="Invalid password")
     
     token_data = {
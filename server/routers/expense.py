@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, File, Query, Request, Response, UploadFile, status
+from fastapi.responses import StreamingResponse
 from utils.auth import get_current_active_user
 from models.account import Account
 from datetime import datetime, timedelta
@@ -7,27 +8,99 @@ from bson.objectid import ObjectId
 from fastapi import HTTPException
 from pydantic import BaseModel
 
-from models.expense import Expense, ExpenseCreate, ExpenseResponse, ExpenseUpdate
+from models.expense import (
+    Expense,
+    ExpenseBatchRequest,
+    ExpenseBatchResponse,
+    ExpenseCreate,
+    ExpenseResponse,
+    ExpenseUpdate,
+    ImportReport,
+)
 from configs.database import db
-from utils.database import insert_and_return, update_and_return, delete_and_return
+from utils.database import insert_and_return, update_and_return_previous, delete_and_return
+from utils.tags import attach_tags, get_tag, get_tags
+from utils.pagination import KEYSET_SORT, NEXT_CURSOR_HEADER, apply_cursor, next_cursor, next_search_cursor
+from utils.rollups import apply_expense_change, get_monthly_rollups
+from utils.export import MEDIA_TYPES, stream_expenses
+from utils.expense_import import detect_format, import_expenses
+from utils.expense_batch import run_expense_batch
+from utils.serialization import expense_list_response
+from utils.data_version import (
+    bump_data_version, get_data_version, is_not_modified, not_modified, set_etag, version_etag,
+)
+from utils.response_cache import response_cache
+from utils.search import normalize, search_fields, search_pipeline
 
 router = APIRouter(prefix="/expenses", tags=["Expenses"], dependencies=[Depends(get_current_active_user)])
 
+async def find_expense_page(
+    query: dict,
+    skip: int,
+    limit: int,
+    cursor: Optional[str] = None,
+    response: Optional[Response] = None
+) -> list:
+    """
+    Fetch one page of expenses in (expense_date, _id) descending order.
+    With a cursor the page is located by keyset instead of skip. Full pages
+    carry the cursor of the following page in the X-Next-Cursor header.
+    """
+    if cursor:
+        try:
+            query = apply_cursor(query, cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        skip = 0
+
+    find_cursor = db.expenses.find(query).sort(KEYSET_SORT).skip(skip).limit(limit)
+    expenses = await find_cursor.to_list(limit)
+
+    token = next_cursor(expenses, limit)
+    if response is not None and token:
+        response.headers[NEXT_CURSOR_HEADER] = token
+    return expenses
+
+def build_expense_query(
+    account_id: str,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    tag_id: Optional[str] = None
+) -> dict:
+    """Filter for an account's live expenses with optional date range and tag"""
+    query = {
+        "account_id": account_id,
+        "deleted": False
+    }
+    
+    # Add date range filter if provided
+    if start_date or end_date:
+        date_filter = {}
+        if start_date:
+            date_filter["$gte"] = start_date
+        if end_date:
+            date_filter["$lte"] = end_date
+        query["expense_date"] = date_filter
+    
+    # Add tag_id filter if provided
+    if tag_id:
+        if not ObjectId.is_valid(tag_id):
+            raise HTTPException(status_code=400, detail="Invalid tag_id format")
+        query["tagId"] = tag_id
+
+    return query
+
 @router.get("/", response_model=List[ExpenseResponse])
 async def get_all_expenses(
+    response: Response,
     skip: int = 0,
-    limit: int = 10
+    limit: int = 10,
+    cursor: Optional[str] = None
 ):
-    cursor = db.expenses.find({"deleted": False}).skip(skip).limit(limit)
-    expenses = await cursor.to_list(limit)
+    expenses = await find_expense_page({"deleted": False}, skip, limit, cursor, response)
     
     # Include tag details in each expense
-    for expense in expenses:
-        tag = await db.tags.find_one({"_id": ObjectId(expense["tagId"])})
-        expense["tag"] = tag
-        del expense["tagId"]
-    
-    return expenses
+    return expense_list_response(await attach_tags(expenses), response)
 
 @router.post("/", response_model=Expense, status_code=status.HTTP_201_CREATED)
 async def create_expense(
@@ -44,23 +117,50 @@ async def create_expense(
     if not ObjectId.is_valid(expense_dict["account_id"]):
         raise HTTPException(status_code=400, detail="Invalid account_id format")
     
-    # Check account exists
-    account = await db.accounts.find_one({"_id": ObjectId(expense_dict["account_id"])})
-    if not account:
-        raise HTTPException(status_code=404, detail="Account not found")
+    # The account was already loaded by get_current_active_user for this request
     
     # If tagId is provided, validate it exists
+    tag = None
     if expense_dict.get("tagId"):
-        tag = await db.tags.find_one({"_id": ObjectId(expense_dict["tagId"])})
+        tag = await get_tag(expense_dict["tagId"])
         if not tag:
             raise HTTPException(status_code=404, detail="Tag not found")
-        
-        # Include tag details in the response
-        created_expense = await insert_and_return(db.expenses, expense_dict, Expense)
-        created_expense_dict = created_expense.dict(by_alias=True)
-        return created_expense_dict
-    
-    return await insert_and_return(db.expenses, expense_dict, Expense)
+
+    expense_dict.update(search_fields(expense_dict["desc"], tag["name"] if tag else None))
+    created_expense = await insert_and_return(db.expenses, expense_dict, Expense)
+    await apply_expense_change(None, expense_dict)
+    await bump_data_version(expense_dict["account_id"])
+    return created_expense
+
+@router.post("/import", response_model=ImportReport)
+async def import_current_user_expenses(
+    file: UploadFile = File(...),
+    import_format: Optional[str] = Query(None, alias="format", pattern="^(csv|ndjson)$"),
+    current_user: Account = Depends(get_current_active_user)
+):
+    """
+    Bulk import expenses from a CSV (with a header row) or NDJSON upload.
+    Rows use the ExpenseCreate fields; invalid rows are reported, not inserted.
+    """
+    import_format = detect_format(file, import_format)
+    report = await import_expenses(db.expenses, str(current_user.id), file, import_format)
+    if report.inserted:
+        await bump_data_version(str(current_user.id))
+    return report
+
+@router.post("/batch", response_model=ExpenseBatchResponse)
+async def batch_update_expenses(
+    batch: ExpenseBatchRequest,
+    current_user: Account = Depends(get_current_active_user)
+):
+    """
+    Update or delete several of the current user's expenses in one request.
+    Updates only set the fields given in `data`; each operation gets its own result.
+    """
+    result = await run_expense_batch(db.expenses, str(current_user.id), batch)
+    if result.updated or result.deleted:
+        await bump_data_version(str(current_user.id))
+    return result
 
 @router.put("/{expense_id}", response_model=Expense)
 async def update_expense(
@@ -79,12 +179,19 @@ async def update_expense(
     if not ObjectId.is_valid(expense_dict["account_id"]):
         raise HTTPException(status_code=400, detail="Invalid account_id format")
     
-    # Check account exists
-    account = await db.accounts.find_one({"_id": ObjectId(expense_dict["account_id"])})
-    if not account:
-        raise HTTPException(status_code=404, detail="Account not found")
-    
-    return await update_and_return(db.expenses, expense_dict, Expense)
+    # The account was already loaded by get_current_active_user for this request
+
+    tag = await get_tag(expense_dict["tagId"]) if expense_dict.get("tagId") else None
+    expense_dict.update(search_fields(expense_dict["desc"], tag["name"] if tag else None))
+
+    # The previous amount and date are needed to move the monthly rollup
+    previous, updated_expense = await update_and_return_previous(db.expenses, expense_dict, Expense)
+    if not previous:
+        raise HTTPException(status_code=404, detail="Expense not found")
+
+    await apply_expense_change(previous, updated_expense.model_dump())
+    await bump_data_version(expense_dict["account_id"])
+    return updated_expense
 
 @router.delete("/{expense_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_expense(
@@ -92,7 +199,10 @@ async def delete_expense(
     current_user: Account = Depends(get_current_active_user)
 ):
     expense_dict = {"_id": ObjectId(expense_id), "account_id": str(current_user.id)}
-    await db.expenses.delete_one(expense_dict)
+    deleted_expense = await delete_and_return(db.expenses, expense_dict)
+    if deleted_expense:
+        await apply_expense_change(deleted_expense, None)
+        await bump_data_version(expense_dict["account_id"])
     return
 
 
@@ -103,42 +213,113 @@ async def get_expenses_by_account_id(
     limit: int = 100,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
-    tag_id: Optional[str] = None
+    tag_id: Optional[str] = None,
+    cursor: Optional[str] = None,
+    response: Response = None
 ):
-    query = {
-        "account_id": account_id,
-        "deleted": False
-    }
-    
-    # Add date range filter if provided
-    if start_date or end_date:
-        date_filter = {}
-        if start_date:
-            date_filter["$gte"] = start_date
-        if end_date:
-            date_filter["$lte"] = end_date
-        query["expense_date"] = date_filter
-    
-    # Add tag_id filter if provided
-    if tag_id:
-        if not ObjectId.is_valid(tag_id):
-            raise HTTPException(status_code=400, detail="Invalid tag_id format")
-        query["tagId"] = tag_id
+    query = build_expense_query(account_id, start_date, end_date, tag_id)
     
     # Find expenses with optional filters
-    cursor = db.expenses.find(query).sort("expense_date", -1).skip(skip).limit(limit)
-    expenses = await cursor.to_list(limit)
+    expenses = await find_expense_page(query, skip, limit, cursor, response)
 
-    for expense in expenses:
-        tag = await db.tags.find_one({"_id": ObjectId(expense["tagId"])})
-        expense["tag"] = tag
-        del expense["tagId"]
-    
-    return expenses
+    # Resolve all tags for the page in one round trip
+    return expense_list_response(await attach_tags(expenses), response)
 
 @router.get("/me", response_model=List[ExpenseResponse])
-async def get_current_user_expenses(current_user: Account = Depends(get_current_active_user)):
-    return await get_expenses_by_account_id(account_id=str(current_user.id))
+async def get_current_user_expenses(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    current_user: Account = Depends(get_current_active_user)
+):
+    return await get_expenses_by_account_id(
+        account_id=str(current_user.id),
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        response=response
+    )
+
+@router.get("/user/{account_id}/search", response_model=List[ExpenseResponse])
+async def search_expenses(
+    account_id: str,
+    q: str = Query(..., min_length=1, max_length=200),
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    tag_id: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    response: Response = None
+):
+    """
+    Search an account's expenses by description and tag name, ignoring case
+    and accents, best matches first. Words match any of them; quote a phrase
+    to require it. Combines with the date range and tag filters, and pages
+    with the X-Next-Cursor header like the listings.
+    """
+    terms = normalize(q)
+    if not terms:
+        raise HTTPException(status_code=400, detail="Search query is empty")
+
+    query = build_expense_query(account_id, start_date, end_date, tag_id)
+    try:
+        pipeline = search_pipeline(query, terms, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    expenses = await db.expenses.aggregate(pipeline).to_list(limit)
+
+    token = next_search_cursor(expenses, limit)
+    if response is not None and token:
+        response.headers[NEXT_CURSOR_HEADER] = token
+    return expense_list_response(await attach_tags(expenses), response)
+
+@router.get("/me/search", response_model=List[ExpenseResponse])
+async def search_current_user_expenses(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    tag_id: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    current_user: Account = Depends(get_current_active_user)
+):
+    return await search_expenses(
+        account_id=str(current_user.id),
+        q=q,
+        start_date=start_date,
+        end_date=end_date,
+        tag_id=tag_id,
+        limit=limit,
+        cursor=cursor,
+        response=response
+    )
+
+@router.get("/me/export")
+async def export_current_user_expenses(
+    export_format: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    tag_id: Optional[str] = None,
+    current_user: Account = Depends(get_current_active_user)
+):
+    """
+    Stream the current user's expenses as CSV or NDJSON, with the same
+    date range and tag filters as get_expenses_by_account_id.
+    """
+    query = build_expense_query(str(current_user.id), start_date, end_date, tag_id)
+    return StreamingResponse(
+        stream_expenses(db.expenses, query, export_format),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="expenses.{export_format}"'}
+    )
+
+def current_month_range() -> tuple:
+    now = datetime.now()
+    first_day = datetime(now.year, now.month, 1)
+    last_day = (first_day.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+    return first_day, last_day
 
 @router.get("/user/{account_id}/current-month", response_model=List[ExpenseResponse])
 async def get_current_month_expenses(
@@ -146,9 +327,7 @@ async def get_current_month_expenses(
     skip: int = 0, 
     limit: int = 100
 ):
-    now = datetime.now()
-    first_day = datetime(now.year, now.month, 1)
-    last_day = (first_day.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+    first_day, last_day = current_month_range()
     
     return await get_expenses_by_account_id(
         account_id=account_id,
@@ -159,8 +338,23 @@ async def get_current_month_expenses(
     )
 
 @router.get("/me/current-month", response_model=List[ExpenseResponse])
-async def get_current_user_month_expenses(current_user: Account = Depends(get_current_active_user)):
-    return await get_current_month_expenses(account_id=str(current_user.id))
+async def get_current_user_month_expenses(
+    request: Request,
+    current_user: Account = Depends(get_current_active_user)
+):
+    # The month is part of the ETag: the page changes on the 1st without a write
+    first_day, last_day = current_month_range()
+    version = await get_data_version(str(current_user.id))
+    etag = version_etag(version, f"{first_day.year}{first_day.month:02d}")
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+
+    query = build_expense_query(str(current_user.id), first_day, last_day)
+    expenses = await find_expense_page(query, skip=0, limit=100)
+    # Tag names cached under the version, so the body is never older than the ETag
+    response = expense_list_response(await attach_tags(expenses, version))
+    set_etag(response, etag)
+    return response
 
 
 @router.get("/user/{account_id}/current-year", response_model=List[ExpenseResponse])
@@ -190,13 +384,15 @@ async def get_expenses_by_tag(
     account_id: str,
     tag_id: str,
     skip: int = 0, 
-    limit: int = 100
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    response: Response = None
 ):
     if not ObjectId.is_valid(tag_id):
         raise HTTPException(status_code=400, detail="Invalid tag_id format")
     
     # First, get the tag to include its details in the response
-    tag = await db.tags.find_one({"_id": ObjectId(tag_id)})
+    tag = await get_tag(tag_id)
     if not tag:
         raise HTTPException(status_code=404, detail="Tag not found")
     
@@ -207,23 +403,31 @@ async def get_expenses_by_tag(
     }
     
     # Find expenses with this tag
-    cursor = db.expenses.find(query).sort("expense_date", -1).skip(skip).limit(limit)
-    expenses = await cursor.to_list(limit)
+    expenses = await find_expense_page(query, skip, limit, cursor, response)
     
     # Include tag details in each expense
     for expense in expenses:
         expense["tag"] = tag
     
-    return expenses
+    return expense_list_response(expenses, response)
 
 @router.get("/me/by-tag/{tag_id}", response_model=List[ExpenseResponse])
 async def get_current_user_expenses_by_tag(
+    response: Response,
     tag_id: str,
     skip: int = 0, 
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: Account = Depends(get_current_active_user)
 ):
-    return await get_expenses_by_tag(account_id=str(current_user.id), tag_id=tag_id, skip=skip, limit=limit)
+    return await get_expenses_by_tag(
+        account_id=str(current_user.id),
+        tag_id=tag_id,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        response=response
+    )
 
 
 class MonthlySummary(BaseModel):
@@ -240,35 +444,64 @@ async def get_monthly_summary(
 ):
     """
     Get monthly expense summary for an account, optionally filtered by year.
+    Reads the materialized monthly_rollups instead of aggregating expenses.
     """
+    return await monthly_summary_response(account_id, year)
+
+async def monthly_summary_response(account_id: str, year: Optional[int], version: Optional[str] = None) -> Response:
+    return await response_cache.get_or_compute(
+        account_id, "monthly-summary", {"year": year},
+        lambda: get_monthly_rollups(account_id, year),
+        MonthlySummary,
+        version=version,
+    )
+
+@router.get("/me/monthly-summary", response_model=List[MonthlySummary])
+async def get_current_user_monthly_summary(
+    request: Request,
+    current_user: Account = Depends(get_current_active_user)
+):
+    # One data version read serves both the ETag and the response cache key
+    version = await get_data_version(str(current_user.id))
+    etag = version_etag(version)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+
+    response = await monthly_summary_response(str(current_user.id), None, version)
+    set_etag(response, etag)
+    return response
+
+
+
+class TagSummary(BaseModel):
+    tag_id: Optional[str] = None
+    tag_name: Optional[str] = None
+    total: float
+    count: int
+
+
+class DailySummary(BaseModel):
+    date: str
+    total: float
+    count: int
+
+
+class TagMonthlySummary(BaseModel):
+    tag_id: Optional[str] = None
+    tag_name: Optional[str] = None
+    year: int
+    month: int
+    total: float
+    count: int
+
+
+async def aggregate_expenses(query: dict, group_id: dict, sort: dict) -> list:
+    """Group matching expenses by `group_id` and sum their amounts in one pipeline"""
     pipeline = [
-        {
-            "$match": {
-                "account_id": account_id,
-                "deleted": False
-            }
-        },
-        {
-            "$project": {
-                "year": {"$year": "$expense_date"},
-                "month": {"$month": "$expense_date"},
-                "amount": 1
-            }
-        }
-    ]
-    
-    # Add year filter if provided
-    if year is not None:
-        pipeline[0]["$match"]["expense_date"] = {
-            "$gte": datetime(year, 1, 1),
-            "$lt": datetime(year + 1, 1, 1)
-        }
-    
-    # Add grouping and sorting
-    pipeline.extend([
+        {"$match": query},
         {
             "$group": {
-                "_id": {"year": "$year", "month": "$month"},
+                "_id": group_id,
                 "total": {"$sum": "$amount"},
                 "count": {"$sum": 1}
             }
@@ -276,18 +509,120 @@ async def get_monthly_summary(
         {
             "$project": {
                 "_id": 0,
-                "year": "$_id.year",
-                "month": "$_id.month",
+                **{key: f"$_id.{key}" for key in group_id},
                 "total": 1,
                 "count": 1
             }
         },
-        {"$sort": {"year": 1, "month": 1}}
-    ])
-    
-    result = await db.expenses.aggregate(pipeline).to_list(None)
-    return result
+        {"$sort": sort}
+    ]
+    return await db.expenses.aggregate(pipeline).to_list(None)
 
-@router.get("/me/monthly-summary", response_model=List[MonthlySummary])
-async def get_current_user_monthly_summary(current_user: Account = Depends(get_current_active_user)):
-    return await get_monthly_summary(account_id=str(current_user.id))
+
+async def with_tag_names(rows: list, version: str) -> list:
+    # Bodies are cached for every worker under `version`, so tag names must
+    # not come from a process-local entry cached before it
+    tags_by_id = await get_tags((row.get("tag_id") for row in rows), version)
+    for row in rows:
+        tag = tags_by_id.get(row.get("tag_id"))
+        row["tag_name"] = tag["name"] if tag else None
+    return rows
+
+
+@router.get("/user/{account_id}/summary/by-tag", response_model=List[TagSummary])
+async def get_tag_summary(
+    account_id: str,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    tag_id: Optional[str] = None
+):
+    """
+    Get expense totals per tag for an account, optionally filtered by date range and tag.
+    """
+    query = build_expense_query(account_id, start_date, end_date, tag_id)
+    version = await get_data_version(account_id)
+
+    async def compute():
+        rows = await aggregate_expenses(query, {"tag_id": "$tagId"}, {"total": -1})
+        return await with_tag_names(rows, version)
+
+    params = {"start_date": start_date, "end_date": end_date, "tag_id": tag_id}
+    return await response_cache.get_or_compute(
+        account_id, "summary/by-tag", params, compute, TagSummary, version=version
+    )
+
+@router.get("/me/summary/by-tag", response_model=List[TagSummary])
+async def get_current_user_tag_summary(
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    tag_id: Optional[str] = None,
+    current_user: Account = Depends(get_current_active_user)
+):
+    return await get_tag_summary(str(current_user.id), start_date, end_date, tag_id)
+
+
+@router.get("/user/{account_id}/summary/by-day", response_model=List[DailySummary])
+async def get_daily_summary(
+    account_id: str,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    tag_id: Optional[str] = None
+):
+    """
+    Get expense totals per day (UTC) for an account, optionally filtered by date range and tag.
+    """
+    query = build_expense_query(account_id, start_date, end_date, tag_id)
+    group_id = {"date": {"$dateToString": {"format": "%Y-%m-%d", "date": "$expense_date"}}}
+    params = {"start_date": start_date, "end_date": end_date, "tag_id": tag_id}
+    return await response_cache.get_or_compute(
+        account_id, "summary/by-day", params,
+        lambda: aggregate_expenses(query, group_id, {"date": 1}),
+        DailySummary,
+    )
+
+@router.get("/me/summary/by-day", response_model=List[DailySummary])
+async def get_current_user_daily_summary(
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    tag_id: Optional[str] = None,
+    current_user: Account = Depends(get_current_active_user)
+):
+    return await get_daily_summary(str(current_user.id), start_date, end_date, tag_id)
+
+
+@router.get("/user/{account_id}/summary/by-tag-month", response_model=List[TagMonthlySummary])
+async def get_tag_monthly_summary(
+    account_id: str,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    tag_id: Optional[str] = None
+):
+    """
+    Get expense totals per tag and month for an account, optionally filtered by date range and tag.
+    """
+    query = build_expense_query(account_id, start_date, end_date, tag_id)
+    group_id = {
+        "tag_id": "$tagId",
+        "year": {"$year": "$expense_date"},
+        "month": {"$month": "$expense_date"}
+    }
+
+    version = await get_data_version(account_id)
+
+    async def compute():
+        rows = await aggregate_expenses(query, group_id, {"year": 1, "month": 1, "total": -1})
+        return await with_tag_names(rows, version)
+
+    params = {"start_date": start_date, "end_date": end_date, "tag_id": tag_id}
+    return await response_cache.get_or_compute(
+        account_id, "summary/by-tag-month", params, compute, TagMonthlySummary, version=version
+    )
+
+@router.get("/me/summary/by-tag-month", response_model=List[TagMonthlySummary])
+async def get_current_user_tag_monthly_summary(
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    tag_id: Optional[str] = None,
+    current_user: Account = Depends(get_current_active_user)
+):
+    return await get_tag_monthly_summary(str(current_user.id), start_date, end_date, tag_id)
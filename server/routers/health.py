@@ -0,0 +1,25 @@
+from fastapi import APIRouter
+from fastapi.responses import ORJSONResponse
+from configs.database import mongo, pool_metrics
+
+router = APIRouter(tags=["Health"])
+
+
+@router.get("/healthz")
+async def healthz():
+    """Liveness: the process is serving requests. Does not touch MongoDB."""
+    return {"status": "ok", "mongo_pool": pool_metrics.stats()}
+
+
+@router.get("/readyz")
+async def readyz():
+    """
+    Readiness: startup (indexes, pool warm-up) has finished and MongoDB
+    answers a ping. Reports pool saturation so load balancers and dashboards
+    can see when requests are queueing for connections.
+    """
+    ready = mongo.ready and await mongo.ping()
+    return ORJSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "unavailable", "mongo_pool": pool_metrics.stats()},
+    )
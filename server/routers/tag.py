@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from utils.auth import get_current_active_user
 from models.account import Account
 from models.tag import Tag, TagCreate, TagUpdate
@@ -6,6 +6,9 @@ from configs.database import db
 from typing import List
 from utils.database import insert_and_return, update_and_return
 from bson.objectid import ObjectId
+from utils.tags import get_account_tags, invalidate_tag
+from utils.search import refresh_tag_terms
+from utils.data_version import bump_data_version, get_data_version, is_not_modified, not_modified, set_etag, version_etag
 
 router = APIRouter(prefix="/tags", tags=["Tags"], dependencies=[Depends(get_current_active_user)])
 
@@ -16,14 +19,25 @@ async def get_all_tags():
 @router.get("/user/{account_id}", response_model=List[Tag])
 async def get_user_tags(account_id: str):
     try:
-        return await db.tags.find({"account_id": account_id}).to_list(100)
+        return await get_account_tags(account_id)
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 @router.get("/me", response_model=List[Tag])
-async def get_current_user_tags(current_user: Account = Depends(get_current_active_user)):
+async def get_current_user_tags(
+    request: Request,
+    response: Response,
+    current_user: Account = Depends(get_current_active_user)
+):
+    version = await get_data_version(str(current_user.id))
+    etag = version_etag(version)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+
+    set_etag(response, etag)
     try:
-        return await db.tags.find({"account_id": str(current_user.id)}).to_list(100)
+        # Cached under the version, so the body is never older than the ETag
+        return await get_account_tags(str(current_user.id), version=version)
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
@@ -42,7 +56,10 @@ async def create_tag(
     if not tag_dict["name"]:
         raise HTTPException(status_code=400, detail="Tag name cannot be empty")
 
-    return await insert_and_return(db.tags, tag_dict, Tag)
+    created_tag = await insert_and_return(db.tags, tag_dict, Tag)
+    invalidate_tag(created_tag.id, tag_dict["account_id"])
+    await bump_data_version(tag_dict["account_id"])
+    return created_tag
 
 @router.put("/{tag_id}", response_model=Tag)
 async def update_tag(
@@ -61,7 +78,13 @@ async def update_tag(
     if not tag_dict["name"]:
         raise HTTPException(status_code=400, detail="Tag name cannot be empty")
 
-    return await update_and_return(db.tags, tag_dict, Tag)
+    updated_tag = await update_and_return(db.tags, tag_dict, Tag)
+    if not updated_tag:
+        raise HTTPException(status_code=404, detail="Tag not found")
+    invalidate_tag(tag_id, tag_dict["account_id"])
+    await refresh_tag_terms(tag_id, tag_dict["account_id"], updated_tag.name)
+    await bump_data_version(tag_dict["account_id"])
+    return updated_tag
     
 @router.delete("/{tag_id}", response_model=Tag)
 async def delete_tag(
@@ -70,4 +93,9 @@ async def delete_tag(
 ):
     tag_dict = {"_id": ObjectId(tag_id), "account_id": str(current_user.id)}
     tag_dict["deleted"] = True
-    return await update_and_return(db.tags, tag_dict, Tag)
\ No newline at end of file
+    deleted_tag = await update_and_return(db.tags, tag_dict, Tag)
+    if not deleted_tag:
+        raise HTTPException(status_code=404, detail="Tag not found")
+    invalidate_tag(tag_id, tag_dict["account_id"])
+    await bump_data_version(tag_dict["account_id"])
+    return deleted_tag
\ No newline at end of file
@@ -1,11 +1,15 @@
 from datetime import datetime, timedelta, timezone
+from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from configs.database import db
 from models.account import Account
 from bson import ObjectId
+from utils.cache import TTLCache
+from utils.password_pool import PasswordHashPool
+from utils.revocation import InMemoryRevocationStore, MongoRevocationStore, RevocationStore
 
 from configs.config import settings
 
@@ -16,16 +20,96 @@ REFRESH_TOKEN_EXPIRE_DAYS = settings.REFRESH_TOKEN_EXPIRE_DAYS
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
-# In-memory token blacklist (for production, use Redis or database)
-token_blacklist = set()
+# bcrypt is CPU bound (~200ms), so async handlers run it on this pool
+password_hash_pool = PasswordHashPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
+
+def create_revocation_store() -> RevocationStore:
+    if settings.REVOCATION_BACKEND == "mongo":
+        return MongoRevocationStore(
+            db.revoked_tokens,
+            sync_seconds=settings.REVOCATION_SYNC_SECONDS,
+            capacity=settings.REVOCATION_BLOOM_CAPACITY,
+        )
+    return InMemoryRevocationStore()
+
+# Revoked tokens; use the mongo backend to share them between workers
+revocation_store = create_revocation_store()
+
+async def is_token_revoked(token: str) -> bool:
+    """Check if a token has been revoked"""
+    return await revocation_store.is_revoked(token)
+
+async def revoke_token(token: str, payload: dict) -> None:
+    """Revoke a token until its own expiry"""
+    if "exp" in payload:
+        expires_at = datetime.fromtimestamp(payload["exp"], timezone.utc)
+    else:
+        expires_at = datetime.now(timezone.utc) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    await revocation_store.revoke(token, expires_at)
+
+# Short-lived cache of authenticated accounts, keyed by user id
+account_cache = TTLCache(
+    maxsize=settings.ACCOUNT_CACHE_SIZE,
+    ttl=settings.ACCOUNT_CACHE_TTL_SECONDS,
+    name="accounts",
+)
+
+# Verified token payloads, so a token is only HMAC-checked and parsed once
+token_cache = TTLCache(
+    maxsize=settings.TOKEN_CACHE_SIZE,
+    ttl=settings.TOKEN_CACHE_TTL_SECONDS,
+    name="tokens",
+)
+
+def decode_token(token: str) -> dict:
+    """
+    Verify and decode a JWT, reusing the cached payload when the same token
+    was verified before. Entries never outlive the token's `exp` claim.
+    Raises JWTError like jwt.decode.
+    """
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
 
-def is_token_blacklisted(token: str) -> bool:
-    """Check if a token is in the blacklist"""
-    return token in token_blacklist
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    ttl = settings.TOKEN_CACHE_TTL_SECONDS
+    if "exp" in payload:
+        ttl = min(ttl, payload["exp"] - datetime.now(timezone.utc).timestamp())
+    if ttl > 0:
+        token_cache.set(token, payload, ttl=ttl)
+    return payload
 
-def add_to_blacklist(token: str) -> None:
-    """Add a token to the blacklist"""
-    token_blacklist.add(token)
+def invalidate_account(user_id: str) -> None:
+    """Drop a cached account after it has been updated or deactivated"""
+    account_cache.delete(str(user_id))
+
+async def load_account(user_id: str, request: Optional[Request] = None) -> Optional[Account]:
+    """
+    Load an account by id, checking the request-scoped memo first, then the
+    process-wide cache, and only then MongoDB.
+    """
+    user_id = str(user_id)
+    memo = None
+    if request is not None:
+        memo = getattr(request.state, "accounts", None)
+        if memo is None:
+            memo = request.state.accounts = {}
+        if user_id in memo:
+            return memo[user_id]
+
+    account = account_cache.get(user_id)
+    if account is None and ObjectId.is_valid(user_id):
+        user = await db.accounts.find_one({"_id": ObjectId(user_id)})
+        if user is not None:
+            account = Account(**user)
+            account_cache.set(user_id, account)
+
+    if memo is not None:
+        memo[user_id] = account
+    return account
 
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
@@ -33,6 +117,14 @@ def hash_password(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+async def hash_password_async(password: str) -> str:
+    """Hash a password on the password hash pool instead of the event loop"""
+    return await password_hash_pool.run(hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the password hash pool instead of the event loop"""
+    return await password_hash_pool.run(verify_password, plain_password, hashed_password)
+
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
@@ -51,10 +143,11 @@ oauth2_scheme = HTTPBearer(
     description="Enter JWT Bearer token"
 )
 
-async def get_token_payload(credentials: HTTPAuthorizationCredentials = Depends(oauth2_scheme)) -> dict:
+async def get_token_payload(request: Request, credentials: HTTPAuthorizationCredentials = Depends(oauth2_scheme)) -> dict:
     """
     Verify and decode the JWT token from the Authorization header.
     Returns the token payload if valid, otherwise raises HTTPException.
+    The payload verified by AuthorizeRequestMiddleware is reused when present.
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -65,15 +158,18 @@ async def get_token_payload(credentials: HTTPAuthorizationCredentials = Depends(
     try:
         token = credentials.credentials
         
-        # Check if token is blacklisted
-        if is_token_blacklisted(token):
+        # Check if token has been revoked
+        if await is_token_revoked(token):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Token has been revoked",
                 headers={"WWW-Authenticate": "Bearer"},
             )
             
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        if getattr(request.state, "token", None) == token:
+            payload = request.state.token_payload
+        else:
+            payload = decode_token(token)
         if payload is None:
             raise credentials_exception
             
@@ -87,7 +183,7 @@ async def get_token_payload(credentials: HTTPAuthorizationCredentials = Depends(
     except (jwt.JWTError, JWTError):
         raise credentials_exception
 
-async def get_current_user(payload: dict = Depends(get_token_payload)) -> Account:
+async def get_current_user(request: Request, payload: dict = Depends(get_token_payload)) -> Account:
     """Get the current user from the JWT token payload."""
     user_id = payload.get("sub")
     if not user_id:
@@ -97,14 +193,19 @@ async def get_current_user(payload: dict = Depends(get_token_payload)) -> Accoun
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user = await db.accounts.find_one({"_id": ObjectId(user_id)})
+    user = await load_account(user_id, request)
     
     if user is None:
         raise HTTPException(status_code=401, detail="User not found")
 
-    return Account(**user)
+    return user
 
 async def get_current_active_user(current_user: Account = Depends(get_current_user)) -> Account:
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
+    return current_user
+
+async def get_current_admin_user(current_user: Account = Depends(get_current_active_user)) -> Account:
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin privileges required")
     return current_user
\ No newline at end of file
@@ -0,0 +1,76 @@
+"""
+Per-account data versions for conditional GETs. Every expense or tag write
+gives the account a new version; read endpoints derive a weak ETag from it
+and answer a matching `If-None-Match` with 304 before querying their data.
+"""
+from bson import ObjectId
+from fastapi import Request, Response
+from pymongo import ReturnDocument
+from starlette.staticfiles import NotModifiedResponse
+from configs.database import db
+
+# Versions are unique ObjectId strings rather than counters, so an ETag can
+# never be reused for different data, even if data_versions is reset.
+# They are always read from MongoDB: a per-process copy would let another
+# worker answer 304 with the body from before a write.
+
+CACHE_CONTROL = "private, no-cache"
+
+
+async def get_data_version(account_id: str) -> str:
+    """The account's current version; one _id lookup, created on first use"""
+    document = await db.data_versions.find_one({"_id": account_id})
+    if document is None:
+        document = await db.data_versions.find_one_and_update(
+            {"_id": account_id},
+            {"$setOnInsert": {"version": str(ObjectId())}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+    return document["version"]
+
+
+async def bump_data_version(account_id: str) -> None:
+    """Give the account a new version after one of its expenses or tags changed"""
+    version = str(ObjectId())
+    await db.data_versions.update_one(
+        {"_id": account_id},
+        {"$set": {"version": version}},
+        upsert=True,
+    )
+
+
+async def account_etag(account_id: str, *parts) -> str:
+    """
+    Weak ETag for a read of the account's data. `parts` distinguishes
+    representations that change without a write, e.g. the current month.
+    Take it before reading the data: a write in between then yields an ETag
+    older than the body, which only costs the client one extra refetch.
+    """
+    return version_etag(await get_data_version(account_id), *parts)
+
+
+def version_etag(version: str, *parts) -> str:
+    """account_etag for a version the caller already read"""
+    return 'W/"' + "-".join([version, *(str(part) for part in parts)]) + '"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """Weak comparison of If-None-Match against the current ETag"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    return NotModifiedResponse({"etag": etag, "cache-control": CACHE_CONTROL})
+
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    # Revalidate every time; the 304 path makes that nearly free
+    response.headers["Cache-Control"] = CACHE_CONTROL
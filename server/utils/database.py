@@ -1,17 +1,55 @@
+from pymongo import ReturnDocument
+
+
+def _ownership_filter(data, owner_field):
+    query = {"_id": data["_id"]}
+    if owner_field and owner_field in data:
+        query[owner_field] = data[owner_field]
+    return query
+
 async def insert_and_return(collection, data, model):
     result = await collection.insert_one(data)
     data["_id"] = result.inserted_id
     return model.model_validate(data)
 
-async def update_and_return(collection, data, model):
-    _id = data["_id"]
-    await collection.update_one({"_id": _id}, {"$set": data})
-    updated_doc = await collection.find_one({"_id": _id})
-    return model.model_validate(updated_doc)
+async def update_and_return(collection, data, model, owner_field="account_id", projection=None):
+    """
+    Set `data` on the document with data["_id"] and return it in one round trip.
+    The filter also matches data[owner_field] when present, so a caller can only
+    update its own documents. Returns None when nothing matched.
+    """
+    changes = {key: value for key, value in data.items() if key != "_id"}
+    updated_doc = await collection.find_one_and_update(
+        _ownership_filter(data, owner_field),
+        {"$set": changes},
+        projection=projection,
+        return_document=ReturnDocument.AFTER,
+    )
+    return model.model_validate(updated_doc) if updated_doc else None
+
+async def update_and_return_previous(collection, data, model, owner_field="account_id"):
+    """
+    Like update_and_return, but also return the document as it was before
+    the update. Returns (previous_doc, updated_model), or (None, None).
+    """
+    changes = {key: value for key, value in data.items() if key != "_id"}
+    previous_doc = await collection.find_one_and_update(
+        _ownership_filter(data, owner_field),
+        {"$set": changes},
+        return_document=ReturnDocument.BEFORE,
+    )
+    if previous_doc is None:
+        return None, None
+    return previous_doc, model.model_validate({**previous_doc, **changes})
 
-async def delete_and_return(collection, data, model):
-    _id = data["_id"]
-    await collection.delete_one({"_id": _id})
-    deleted_doc = await collection.find_one({"_id": _id})
-    return model.model_validate(deleted_doc)
-    
\ No newline at end of file
+async def delete_and_return(collection, data, owner_field="account_id", projection=None):
+    """
+    Delete the document with data["_id"] (and data[owner_field], when present)
+    and return it as stored, in one round trip. Returns None when nothing
+    matched. It is not validated: the delete has already happened, and a
+    legacy document that no longer fits the model must not fail the request.
+    """
+    return await collection.find_one_and_delete(
+        _ownership_filter(data, owner_field),
+        projection=projection,
+    )
@@ -0,0 +1,104 @@
+from datetime import datetime
+from bson import ObjectId
+from pymongo import DeleteOne, UpdateOne
+from pymongo.errors import BulkWriteError
+from models.expense import ExpenseBatchRequest, ExpenseBatchResponse, ExpenseBatchResult
+from utils.rollups import apply_deltas, merge_deltas, rollup_deltas
+from utils.search import normalize
+from utils.tags import get_tags
+
+
+async def run_expense_batch(collection, account_id: str, batch: ExpenseBatchRequest) -> ExpenseBatchResponse:
+    """
+    Apply a list of update/delete operations to the caller's expenses.
+    Owned documents are read once up front, to report missing ids and move
+    the monthly rollups, and every write goes out in one unordered bulk_write.
+    """
+    results = [
+        ExpenseBatchResult(index=index, id=operation.id, op=operation.op, status="updated")
+        for index, operation in enumerate(batch.operations)
+    ]
+
+    ids = {ObjectId(operation.id) for operation in batch.operations if ObjectId.is_valid(operation.id)}
+    current = {}
+    if ids:
+        async for expense in collection.find({"_id": {"$in": list(ids)}, "account_id": account_id}):
+            current[str(expense["_id"])] = expense
+
+    # Only explicitly given fields are set; null only makes sense for tagId
+    patches = [
+        {
+            field: value
+            for field, value in (operation.data.model_dump(exclude_unset=True) if operation.data else {}).items()
+            if value is not None or field == "tagId"
+        }
+        for operation in batch.operations
+    ]
+    tags_by_id = await get_tags(patch.get("tagId") for patch in patches)
+
+    requests = []
+    request_results = []
+    request_deltas = []
+    for operation, patch, result in zip(batch.operations, patches, results):
+        if not ObjectId.is_valid(operation.id):
+            result.status, result.error = "invalid", "Invalid expense id format"
+            continue
+        before = current.get(operation.id)
+        if before is None:
+            result.status = "not_found"
+            continue
+        ownership = {"_id": before["_id"], "account_id": account_id}
+
+        if operation.op == "delete":
+            requests.append(DeleteOne(ownership))
+            request_deltas.append(rollup_deltas(before, None))
+            request_results.append(result)
+            current[operation.id] = None
+            result.status = "deleted"
+            continue
+
+        if not patch:
+            result.status, result.error = "invalid", "Update requires data"
+            continue
+        if patch.get("tagId") and patch["tagId"] not in tags_by_id:
+            result.status, result.error = "invalid", "Tag not found"
+            continue
+        if "desc" in patch:
+            patch["desc"] = patch["desc"].strip()
+            patch["desc_terms"] = normalize(patch["desc"])
+        if "tagId" in patch:
+            tag = tags_by_id.get(patch["tagId"])
+            patch["tag_terms"] = normalize(tag["name"] if tag else None)
+        patch["updated_at"] = datetime.now()
+
+        after = {**before, **patch}
+        requests.append(UpdateOne(ownership, {"$set": patch}))
+        request_deltas.append(rollup_deltas(before, after))
+        current[operation.id] = after
+        request_results.append(result)
+
+    failed_indexes = set()
+    if requests:
+        try:
+            await collection.bulk_write(requests, ordered=False)
+        except BulkWriteError as e:
+            for write_error in e.details.get("writeErrors", []):
+                failed_indexes.add(write_error["index"])
+                result = request_results[write_error["index"]]
+                result.status, result.error = "error", write_error["errmsg"]
+
+    deltas = {}
+    for index, delta in enumerate(request_deltas):
+        if index not in failed_indexes:
+            merge_deltas(deltas, delta)
+    await apply_deltas(deltas)
+
+    response = ExpenseBatchResponse(results=results)
+    for result in results:
+        if result.status == "updated":
+            response.updated += 1
+        elif result.status == "deleted":
+            response.deleted += 1
+        else:
+            response.failed += 1
+    return response
@@ -0,0 +1,148 @@
+import csv
+import itertools
+import json
+from typing import Iterator, Optional
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
+from models.expense import ExpenseCreate, ImportReport, ImportRowError
+from utils.rollups import apply_deltas, merge_deltas, rollup_deltas
+from utils.search import search_fields
+from utils.tags import get_tags
+
+IMPORT_CHUNK_SIZE = 1000
+
+
+def detect_format(upload: UploadFile, requested: Optional[str] = None) -> str:
+    if requested:
+        return requested
+    filename = (upload.filename or "").lower()
+    if filename.endswith((".ndjson", ".jsonl")) or "ndjson" in (upload.content_type or ""):
+        return "ndjson"
+    return "csv"
+
+
+def _decoded_lines(file) -> Iterator[str]:
+    """
+    Decode the upload one line at a time, keeping line endings as csv
+    expects, so a decoding error is reported at the row that has it
+    """
+    for number, line in enumerate(file):
+        yield line.decode("utf-8-sig" if number == 0 else "utf-8")
+
+
+def _iter_rows(upload: UploadFile, import_format: str) -> Iterator:
+    """
+    Yield raw rows from the upload, or a ValueError for a row that could not
+    be read; runs in a worker thread. Undecodable text or malformed CSV ends
+    the upload at that row, since the rows after it cannot be trusted.
+    """
+    text = _decoded_lines(upload.file)
+    try:
+        if import_format == "csv":
+            for row in csv.DictReader(text):
+                # Blank cells mean "not provided"
+                yield {key: value for key, value in row.items() if key and value not in ("", None)}
+            return
+        for line in text:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                yield ValueError(f"Invalid JSON: {e}")
+    except UnicodeDecodeError as e:
+        yield ValueError(f"Row is not valid UTF-8 ({e.reason}); it and the rows after it were not read")
+    except csv.Error as e:
+        yield ValueError(f"Invalid CSV: {e}; the rows after it were not read")
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}" for item in error.errors()
+    )
+
+
+async def _import_chunk(collection, account_id: str, chunk: list, first_row: int, report: ImportReport) -> None:
+    documents = []
+    rows = []
+    for offset, raw in enumerate(chunk):
+        row_number = first_row + offset
+        if isinstance(raw, Exception):
+            report.errors.append(ImportRowError(row=row_number, error=str(raw)))
+            continue
+        if not isinstance(raw, dict):
+            report.errors.append(ImportRowError(row=row_number, error="Row must be an object"))
+            continue
+        if "tag_id" in raw and "tagId" not in raw:
+            raw["tagId"] = raw.pop("tag_id")
+        try:
+            expense = ExpenseCreate.model_validate(raw)
+        except ValidationError as e:
+            report.errors.append(ImportRowError(row=row_number, error=_validation_message(e)))
+            continue
+        expense_dict = expense.model_dump(by_alias=True)
+        expense_dict["account_id"] = account_id
+        expense_dict["desc"] = (expense_dict["desc"] or "").strip()
+        documents.append(expense_dict)
+        rows.append(row_number)
+
+    # Resolve every referenced tag for the chunk in one query
+    tags_by_id = await get_tags(document.get("tagId") for document in documents)
+    valid_documents = []
+    valid_rows = []
+    for document, row_number in zip(documents, rows):
+        if document.get("tagId") and document["tagId"] not in tags_by_id:
+            report.errors.append(ImportRowError(row=row_number, error="Tag not found"))
+            continue
+        tag = tags_by_id.get(document.get("tagId"))
+        document.update(search_fields(document["desc"], tag["name"] if tag else None))
+        valid_documents.append(document)
+        valid_rows.append(row_number)
+
+    if not valid_documents:
+        return
+
+    failed_indexes = set()
+    try:
+        await collection.insert_many(valid_documents, ordered=False)
+    except BulkWriteError as e:
+        for write_error in e.details.get("writeErrors", []):
+            failed_indexes.add(write_error["index"])
+            report.errors.append(ImportRowError(row=valid_rows[write_error["index"]], error=write_error["errmsg"]))
+
+    inserted = [document for index, document in enumerate(valid_documents) if index not in failed_indexes]
+    report.inserted += len(inserted)
+
+    deltas = {}
+    for document in inserted:
+        merge_deltas(deltas, rollup_deltas(None, document))
+    await apply_deltas(deltas)
+
+
+async def import_expenses(
+    collection,
+    account_id: str,
+    upload: UploadFile,
+    import_format: str,
+    chunk_size: int = IMPORT_CHUNK_SIZE
+) -> ImportReport:
+    """
+    Validate and insert the rows of a CSV or NDJSON upload in chunks.
+    Each chunk costs one tag lookup and one unordered insert_many.
+    Rows are numbered from 1, not counting the CSV header.
+    """
+    report = ImportReport()
+    rows = _iter_rows(upload, import_format)
+    first_row = 1
+    while True:
+        chunk = await run_in_threadpool(lambda: list(itertools.islice(rows, chunk_size)))
+        if not chunk:
+            break
+        await _import_chunk(collection, account_id, chunk, first_row, report)
+        first_row += len(chunk)
+
+    report.errors.sort(key=lambda error: error.row)
+    report.failed = len(report.errors)
+    return report
@@ -0,0 +1,67 @@
+import csv
+import io
+import json
+from typing import AsyncIterator
+from utils.pagination import KEYSET_SORT
+from utils.tags import get_tags
+
+EXPORT_FIELDS = ["id", "expense_date", "amount", "desc", "tag_id", "tag_name", "created_at"]
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+# Only the fields that end up in the export are read from MongoDB
+_PROJECTION = {"expense_date": 1, "amount": 1, "desc": 1, "tagId": 1, "created_at": 1}
+
+
+def _isoformat(value):
+    return value.isoformat() if value is not None else None
+
+
+async def _export_rows(batch: list) -> list:
+    tags_by_id = await get_tags(expense.get("tagId") for expense in batch)
+    rows = []
+    for expense in batch:
+        tag = tags_by_id.get(expense.get("tagId"))
+        rows.append({
+            "id": str(expense["_id"]),
+            "expense_date": _isoformat(expense.get("expense_date")),
+            "amount": expense.get("amount"),
+            "desc": expense.get("desc", ""),
+            "tag_id": expense.get("tagId"),
+            "tag_name": tag["name"] if tag else None,
+            "created_at": _isoformat(expense.get("created_at")),
+        })
+    return rows
+
+
+def _encode(rows: list, export_format: str) -> str:
+    if export_format == "ndjson":
+        return "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
+    buffer = io.StringIO()
+    csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS).writerows(rows)
+    return buffer.getvalue()
+
+
+async def stream_expenses(collection, query: dict, export_format: str, batch_size: int = 1000) -> AsyncIterator[bytes]:
+    """
+    Yield the matching expenses encoded as CSV or NDJSON, one chunk per
+    cursor batch, so memory stays flat however many rows are exported.
+    Tag names are resolved once per batch.
+    """
+    if export_format == "csv":
+        buffer = io.StringIO()
+        csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS).writeheader()
+        yield buffer.getvalue().encode("utf-8")
+
+    cursor = collection.find(query, _PROJECTION).sort(KEYSET_SORT).batch_size(batch_size)
+    batch = []
+    async for expense in cursor:
+        batch.append(expense)
+        if len(batch) >= batch_size:
+            yield _encode(await _export_rows(batch), export_format).encode("utf-8")
+            batch = []
+    if batch:
+        yield _encode(await _export_rows(batch), export_format).encode("utf-8")
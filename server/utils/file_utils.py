@@ -1,27 +1,117 @@
+import hashlib
+import logging
 import os
+import re
 import uuid
-from fastapi import UploadFile
 from typing import Optional
-import shutil
+import anyio
+from fastapi import HTTPException, UploadFile, status
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse
+from configs.config import settings
+
+logger = logging.getLogger(__name__)
 
 # Create uploads directory if it doesn't exist
 UPLOAD_DIR = "uploads/avatars"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
-async def save_upload_file(upload_file: UploadFile, user_id: str) -> str:
+CHUNK_SIZE = 64 * 1024
+THUMBNAIL_SIZES = (64, 256)
+
+# Content-addressed uploads are named <owner>_<sha256 prefix>.<ext>
+DIGEST_LENGTH = 16
+_DIGEST_IN_NAME = re.compile(rf"_([0-9a-f]{{{DIGEST_LENGTH}}})(?:_\d+)?\.[a-z]+$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+DEFAULT_CACHE_CONTROL = "public, max-age=3600"
+
+
+def sniff_image_type(head: bytes) -> Optional[str]:
+    """Return the file extension for a supported image, judged by its magic bytes"""
+    if head.startswith(b"\xff\xd8\xff"):
+        return ".jpg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return ".png"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return ".gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return ".webp"
+    return None
+
+
+def path_to_url(file_path: str) -> str:
+    # Convert path to URL format in a cross-platform way
+    normalized_path = os.path.normpath(file_path)
+    return f"/{normalized_path.replace(os.sep, '/').lstrip('/')}"
+
+
+async def save_avatar(upload_file: UploadFile, user_id: str, max_bytes: int = None) -> str:
     """
-    Save an uploaded file and return the file path
+    Stream an uploaded avatar to disk in chunks without blocking the event
+    loop and return its path. The type is taken from the file's content,
+    not its name; anything but JPEG/PNG/GIF/WebP is rejected, as is
+    anything over `max_bytes`. The final name embeds a content digest so
+    it can be served as immutable.
     """
-    # Generate a unique filename
-    file_ext = os.path.splitext(upload_file.filename or "")
-    filename = f"{user_id}_{uuid.uuid4()}{file_ext[1]}"
-    file_path = os.path.join(UPLOAD_DIR, filename)
-    
-    # Save the file
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(upload_file.file, buffer)
-    
-    return file_path
+    max_bytes = max_bytes or settings.AVATAR_MAX_BYTES
+    head = await upload_file.read(CHUNK_SIZE)
+    file_ext = sniff_image_type(head)
+    if file_ext is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Avatar must be a JPEG, PNG, GIF or WebP image")
+
+    temp_path = os.path.join(UPLOAD_DIR, f".{user_id}_{uuid.uuid4()}.part")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async with await anyio.open_file(temp_path, "wb") as buffer:
+            chunk = head
+            while chunk:
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"Avatar must be at most {max_bytes // 1024} KB",
+                    )
+                digest.update(chunk)
+                await buffer.write(chunk)
+                chunk = await upload_file.read(CHUNK_SIZE)
+
+        file_path = os.path.join(UPLOAD_DIR, f"{user_id}_{digest.hexdigest()[:DIGEST_LENGTH]}{file_ext}")
+        await anyio.to_thread.run_sync(os.replace, temp_path, file_path)
+        return file_path
+    except BaseException:
+        await anyio.to_thread.run_sync(delete_file, temp_path)
+        raise
+
+
+def generate_thumbnails(file_path: str, sizes=THUMBNAIL_SIZES) -> list:
+    """
+    Write square-bounded thumbnails next to an avatar, e.g. <name>_64.png.
+    Meant to run as a background task; Pillow is optional and thumbnails
+    are skipped when it is not installed.
+    """
+    try:
+        from PIL import Image
+    except ImportError:
+        logger.warning("Pillow is not installed, skipping avatar thumbnails")
+        return []
+
+    root, file_ext = os.path.splitext(file_path)
+    thumbnails = []
+    try:
+        with Image.open(file_path) as image:
+            for size in sizes:
+                thumbnail = image.copy()
+                thumbnail.thumbnail((size, size))
+                thumbnail_path = f"{root}_{size}{file_ext}"
+                thumbnail.save(thumbnail_path)
+                thumbnails.append(thumbnail_path)
+    except Exception:
+        logger.exception("Could not generate thumbnails for %s", file_path)
+    return thumbnails
+
 
 def delete_file(file_path: str) -> bool:
     """
@@ -34,3 +124,24 @@ def delete_file(file_path: str) -> bool:
     except Exception:
         pass
     return False
+
+
+class CachedStaticFiles(StaticFiles):
+    """
+    StaticFiles with long-lived caching. Content-addressed files get their
+    digest as a strong ETag and an immutable Cache-Control; other files
+    keep Starlette's ETag with a shorter max-age.
+    """
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        response = FileResponse(full_path, status_code=status_code, stat_result=stat_result)
+        match = _DIGEST_IN_NAME.search(os.path.basename(full_path))
+        if match:
+            response.headers["etag"] = f'"{match.group(1)}"'
+            response.headers["cache-control"] = IMMUTABLE_CACHE_CONTROL
+        else:
+            response.headers["cache-control"] = DEFAULT_CACHE_CONTROL
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
@@ -0,0 +1,256 @@
+"""
+Minimal Prometheus instrumentation: labelled counters and histograms, a
+text-format renderer for `/metrics`, and a per-request context that
+MongoDB command monitoring adds its operations to.
+"""
+import bisect
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Tuple
+from pymongo import monitoring
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values: Dict[tuple, float] = {}
+        self._lock = Lock()
+
+    def inc(self, *label_values, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = (), buckets=DURATION_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self._series: Dict[tuple, list] = {}
+        self._lock = Lock()
+
+    def observe(self, value: float, *label_values) -> None:
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                # per-bucket counts, then +Inf count and sum
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[bisect.bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label_values, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip((*self.buckets, "+Inf"), series[:-1]):
+                    cumulative += count
+                    labels = _format_labels((*self.labels, "le"), (*label_values, bound))
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.labels, label_values)
+                lines.append(f"{self.name}_sum{labels} {series[-1]}")
+                lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors: List[Callable[[], List[str]]] = []
+
+    def counter(self, *args, **kwargs) -> Counter:
+        metric = Counter(*args, **kwargs)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, *args, **kwargs) -> Histogram:
+        metric = Histogram(*args, **kwargs)
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Callable[[], List[str]]) -> None:
+        """Add a callable returning extra exposition lines, e.g. gauges read at scrape time"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.collect())
+        for collector in self._collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+
+def sample_lines(name: str, documentation: str, samples: List[Tuple[dict, float]], metric_type: str = "gauge") -> List[str]:
+    """Exposition lines for values read at scrape time, e.g. from stats() dicts"""
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} {metric_type}"]
+    for labels, value in samples:
+        lines.append(f"{name}{_format_labels(tuple(labels), tuple(labels.values()))} {value}")
+    return lines
+
+
+registry = Registry()
+
+http_requests_total = registry.counter(
+    "http_requests_total", "HTTP requests by route and status", ("method", "route", "status"))
+http_request_duration_seconds = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency", ("method", "route"))
+http_request_db_operations = registry.histogram(
+    "http_request_db_operations", "MongoDB commands issued per HTTP request", ("method", "route"),
+    buckets=COUNT_BUCKETS)
+mongodb_commands_total = registry.counter(
+    "mongodb_commands_total", "MongoDB commands by name and outcome", ("command", "status"))
+mongodb_command_duration_seconds = registry.histogram(
+    "mongodb_command_duration_seconds", "MongoDB command latency", ("command",))
+
+
+def route_label(scope: dict) -> str:
+    """The matched route template, so metrics are not labelled per id"""
+    route = scope.get("route")
+    if route is not None and hasattr(route, "path"):
+        return route.path
+    if scope["path"].startswith("/uploads/"):
+        return "/uploads"
+    return "unmatched"
+
+
+@dataclass
+class RequestStats:
+    scope: dict
+    db_operations: int = 0
+    db_seconds: float = 0.0
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def method(self) -> str:
+        return self.scope["method"]
+
+    @property
+    def route(self) -> str:
+        return route_label(self.scope)
+
+
+# Set by MetricsMiddleware for the duration of a request. Motor runs PyMongo on
+# executor threads with a copy of the caller's context, so command listeners
+# see the same RequestStats object.
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """PyMongo command listener feeding the global and per-request metrics"""
+
+    def _record(self, event, status: str) -> None:
+        seconds = event.duration_micros / 1_000_000
+        mongodb_commands_total.inc(event.command_name, status)
+        mongodb_command_duration_seconds.observe(seconds, event.command_name)
+        stats = current_request.get()
+        if stats is not None:
+            stats.db_operations += 1
+            stats.db_seconds += seconds
+
+    def started(self, event) -> None:
+        pass
+
+    def succeeded(self, event) -> None:
+        self._record(event, "succeeded")
+
+    def failed(self, event) -> None:
+        self._record(event, "failed")
+
+
+class MongoPoolMetrics(monitoring.ConnectionPoolListener):
+    """
+    PyMongo pool listener tracking open and checked-out connections and
+    requests waiting for one, summed over every server in the deployment.
+    """
+
+    def __init__(self, max_pool_size: int):
+        self.max_pool_size = max_pool_size
+        self.servers = set()
+        self.open = 0
+        self.checked_out = 0
+        self.waiting = 0
+        self.checkout_timeouts = 0
+        self._lock = Lock()
+
+    def _add(self, field: str, delta: int) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + delta)
+
+    def pool_created(self, event) -> None:
+        with self._lock:
+            self.servers.add(event.address)
+
+    def pool_closed(self, event) -> None:
+        with self._lock:
+            self.servers.discard(event.address)
+
+    def pool_ready(self, event) -> None:
+        pass
+
+    def pool_cleared(self, event) -> None:
+        pass
+
+    def connection_created(self, event) -> None:
+        self._add("open", 1)
+
+    def connection_ready(self, event) -> None:
+        pass
+
+    def connection_closed(self, event) -> None:
+        self._add("open", -1)
+
+    def connection_check_out_started(self, event) -> None:
+        self._add("waiting", 1)
+
+    def connection_check_out_failed(self, event) -> None:
+        with self._lock:
+            self.waiting -= 1
+            if event.reason == monitoring.ConnectionCheckOutFailedReason.TIMEOUT:
+                self.checkout_timeouts += 1
+
+    def connection_checked_out(self, event) -> None:
+        with self._lock:
+            self.waiting -= 1
+            self.checked_out += 1
+
+    def connection_checked_in(self, event) -> None:
+        self._add("checked_out", -1)
+
+    def stats(self) -> dict:
+        with self._lock:
+            capacity = self.max_pool_size * max(len(self.servers), 1)
+            return {
+                "servers": len(self.servers),
+                "max_pool_size": self.max_pool_size,
+                "open": self.open,
+                "checked_out": self.checked_out,
+                "waiting": self.waiting,
+                "checkout_timeouts": self.checkout_timeouts,
+                "saturation": round(self.checked_out / capacity, 3) if self.max_pool_size else 0.0,
+            }
@@ -0,0 +1,71 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+from bson import ObjectId
+from bson.errors import InvalidId
+
+# Keyset order shared by every expense listing; (expense_date, _id) is unique
+KEYSET_SORT = [("expense_date", -1), ("_id", -1)]
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(expense: dict) -> str:
+    """Build an opaque cursor pointing just after the given expense"""
+    raw = json.dumps({"d": expense["expense_date"].isoformat(), "i": str(expense["_id"])})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """Return (expense_date, _id) from a cursor. Raises ValueError if malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(data["d"]), ObjectId(data["i"])
+    except (ValueError, KeyError, TypeError, InvalidId) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def apply_cursor(query: dict, cursor: str) -> dict:
+    """Restrict a query to the documents that sort after the cursor"""
+    expense_date, _id = decode_cursor(cursor)
+    query["$or"] = [
+        {"expense_date": {"$lt": expense_date}},
+        {"expense_date": expense_date, "_id": {"$lt": _id}},
+    ]
+    return query
+
+
+def next_cursor(expenses: list, limit: int) -> Optional[str]:
+    """Cursor for the following page, or None when this page is the last one"""
+    if limit <= 0 or len(expenses) < limit:
+        return None
+    return encode_cursor(expenses[-1])
+
+
+# Search results are ranked by text score; _id breaks ties between equal scores
+SEARCH_SORT = {"score": -1, "_id": -1}
+
+
+def encode_search_cursor(expense: dict) -> str:
+    """Build an opaque cursor pointing just after the given search result"""
+    raw = json.dumps({"s": expense["score"], "i": str(expense["_id"])})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_search_cursor(cursor: str) -> tuple:
+    """Return (score, _id) from a search cursor. Raises ValueError if malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return float(data["s"]), ObjectId(data["i"])
+    except (ValueError, KeyError, TypeError, InvalidId) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def next_search_cursor(expenses: list, limit: int) -> Optional[str]:
+    """Cursor for the following page of search results, or None on the last page"""
+    if limit <= 0 or len(expenses) < limit:
+        return None
+    return encode_search_cursor(expenses[-1])
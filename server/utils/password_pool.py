@@ -0,0 +1,98 @@
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from fastapi import HTTPException, status
+
+
+class PasswordHashPool:
+    """
+    Runs bcrypt work on a dedicated, size-limited thread pool so it never
+    blocks the event loop. bcrypt releases the GIL, so threads run in parallel.
+
+    At most `workers + max_queue` calls are admitted at once; beyond that
+    callers get a 503 instead of piling up behind a login storm.
+    """
+
+    def __init__(self, workers: int, max_queue: int, window: int = 1024):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self.admitted = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self._wait_times = deque(maxlen=window)
+        self._run_times = deque(maxlen=window)
+        # Counters are updated from the executor threads as well as the loop
+        self._lock = Lock()
+
+    @property
+    def queue_depth(self) -> int:
+        return self.admitted - self.running
+
+    async def run(self, func, *args):
+        with self._lock:
+            admit = self.admitted < self.workers + self.max_queue
+            if admit:
+                self.admitted += 1
+            else:
+                self.rejected += 1
+        if not admit:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please retry",
+                headers={"Retry-After": "1"},
+            )
+
+        queued_at = time.perf_counter()
+
+        def timed():
+            started = time.perf_counter()
+            with self._lock:
+                self.running += 1
+            try:
+                return func(*args)
+            finally:
+                finished = time.perf_counter()
+                with self._lock:
+                    self.running -= 1
+                    self.completed += 1
+                    self._wait_times.append(started - queued_at)
+                    self._run_times.append(finished - started)
+
+        future = self._executor.submit(timed)
+        # Released when the job ends, not when the awaiting request is
+        # cancelled: a cancelled caller's bcrypt job still occupies a thread
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, future) -> None:
+        with self._lock:
+            self.admitted -= 1
+
+    @staticmethod
+    def _percentiles(samples) -> dict:
+        ordered = sorted(samples)
+        if not ordered:
+            return {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+
+        def pick(q: float) -> float:
+            return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+        return {"p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99)}
+
+    def stats(self) -> dict:
+        with self._lock:
+            wait_times, run_times = list(self._wait_times), list(self._run_times)
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "queue_depth": self.queue_depth,
+            "running": self.running,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "wait_seconds": self._percentiles(wait_times),
+            "run_seconds": self._percentiles(run_times),
+        }
@@ -0,0 +1,232 @@
+"""
+Response cache for per-account aggregate endpoints. Bodies are cached as
+serialized JSON under (account_id, data version, endpoint, params): every
+expense or tag write bumps the account's data version, so the next read
+misses precisely for that account. Concurrent misses for the same key are
+computed once. The version is read from MongoDB on every lookup, so a
+write through any worker is seen by the next read.
+"""
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from threading import Lock
+from typing import Awaitable, Callable, List, Optional, Type
+import orjson
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+from configs.config import settings
+from configs.database import db
+from utils.data_version import get_data_version
+
+
+class ResponseCacheBackend(ABC):
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, account_id: str, version: str, body: bytes) -> None:
+        ...
+
+    def stats(self) -> dict:
+        return {}
+
+
+class NullBackend(ResponseCacheBackend):
+    """Caching disabled; concurrent misses are still coalesced"""
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return None
+
+    async def set(self, key: str, account_id: str, version: str, body: bytes) -> None:
+        pass
+
+
+class MemoryBackend(ResponseCacheBackend):
+    """
+    Per-process LRU bounded by the total size of the cached bodies. Entries
+    of an account's older data versions are dropped as soon as a newer
+    version is stored, instead of waiting to be evicted.
+    """
+
+    def __init__(self, max_bytes: int, ttl: float):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.bytes = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._accounts = {}
+        self._lock = Lock()
+
+    def _drop(self, key: str) -> None:
+        account_id, version, body, expires_at = self._entries.pop(key)
+        self.bytes -= len(key) + len(body)
+        keys = self._accounts[account_id][1]
+        keys.discard(key)
+        if not keys:
+            del self._accounts[account_id]
+
+    async def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[3] <= time.monotonic():
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[2]
+
+    async def set(self, key: str, account_id: str, version: str, body: bytes) -> None:
+        size = len(key) + len(body)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            current = self._accounts.get(account_id)
+            if current is not None and current[0] != version:
+                # ObjectId versions sort by creation time
+                if version < current[0]:
+                    return  # computed from a stale version; a newer one is cached
+                for stale_key in list(current[1]):
+                    self._drop(stale_key)
+            if key in self._entries:
+                self._drop(key)
+
+            expires_at = time.monotonic() + self.ttl
+            self._entries[key] = (account_id, version, body, expires_at)
+            self._accounts.setdefault(account_id, (version, set()))[1].add(key)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+        }
+
+
+class MongoBackend(ResponseCacheBackend):
+    """Shared between workers; expired documents are removed by a TTL index"""
+
+    def __init__(self, collection, ttl: float):
+        self.collection = collection
+        self.ttl = ttl
+
+    async def get(self, key: str) -> Optional[bytes]:
+        document = await self.collection.find_one(
+            {"_id": key, "expires_at": {"$gt": datetime.now(timezone.utc)}},
+            {"body": 1},
+        )
+        return bytes(document["body"]) if document else None
+
+    async def set(self, key: str, account_id: str, version: str, body: bytes) -> None:
+        await self.collection.replace_one(
+            {"_id": key},
+            {
+                "account_id": account_id,
+                "body": body,
+                "expires_at": datetime.now(timezone.utc) + timedelta(seconds=self.ttl),
+            },
+            upsert=True,
+        )
+
+
+class ResponseCache:
+    def __init__(self, backend: ResponseCacheBackend, name: str = "responses"):
+        self.backend = backend
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._inflight = {}
+        self._adapters = {}
+
+    def _adapter(self, model: Type[BaseModel]) -> TypeAdapter:
+        adapter = self._adapters.get(model)
+        if adapter is None:
+            adapter = self._adapters[model] = TypeAdapter(List[model])
+        return adapter
+
+    async def get_or_compute(
+        self,
+        account_id: str,
+        endpoint: str,
+        params: dict,
+        compute: Callable[[], Awaitable[list]],
+        model: Type[BaseModel],
+        version: Optional[str] = None,
+    ) -> Response:
+        """
+        Return the cached JSON list for this account, endpoint and params, or
+        compute it, validate it against `model` once and cache the body.
+        Pass `version` when the caller has already read the data version.
+        """
+        if version is None:
+            version = await get_data_version(account_id)
+        key = f"{account_id}:{version}:{endpoint}:" + orjson.dumps(params, option=orjson.OPT_SORT_KEYS).decode()
+
+        body = await self.backend.get(key)
+        if body is not None:
+            self.hits += 1
+            return Response(body, media_type="application/json")
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+            task = self._inflight[key] = asyncio.ensure_future(self._compute(key, account_id, version, compute, model))
+            task.add_done_callback(partial(self._finished, key))
+        else:
+            # Another request is computing this body; wait for it instead of
+            # running the same aggregation again
+            self.coalesced += 1
+
+        # Shielded so a disconnecting client does not cancel the computation
+        # for the requests waiting on it
+        body = await asyncio.shield(task)
+        return Response(body, media_type="application/json")
+
+    def _finished(self, key: str, task: asyncio.Task) -> None:
+        self._inflight.pop(key, None)
+        # Retrieve the error even when every waiter was cancelled, so an
+        # orphaned failure is not reported as "never retrieved"
+        if not task.cancelled():
+            task.exception()
+
+    async def _compute(self, key: str, account_id: str, version: str, compute, model) -> bytes:
+        adapter = self._adapter(model)
+        body = adapter.dump_json(adapter.validate_python(await compute()))
+        await self.backend.set(key, account_id, version, body)
+        return body
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "name": self.name,
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+            **self.backend.stats(),
+        }
+
+
+def create_response_cache() -> ResponseCache:
+    if settings.RESPONSE_CACHE_BACKEND == "mongo":
+        backend = MongoBackend(db.response_cache, ttl=settings.RESPONSE_CACHE_TTL_SECONDS)
+    elif settings.RESPONSE_CACHE_BACKEND == "memory":
+        backend = MemoryBackend(max_bytes=settings.RESPONSE_CACHE_MAX_BYTES, ttl=settings.RESPONSE_CACHE_TTL_SECONDS)
+    else:
+        backend = NullBackend()
+    return ResponseCache(backend)
+
+
+# Aggregate endpoint bodies; use the mongo backend to share them between workers
+response_cache = create_response_cache()
@@ -0,0 +1,146 @@
+import asyncio
+import hashlib
+import math
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+
+def token_key(token: str) -> str:
+    """Tokens are stored by digest so the store never holds usable credentials"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class RevocationStore(ABC):
+    """Records revoked tokens until they expire on their own"""
+
+    @abstractmethod
+    async def revoke(self, token: str, expires_at: datetime) -> None:
+        ...
+
+    @abstractmethod
+    async def is_revoked(self, token: str) -> bool:
+        ...
+
+
+class InMemoryRevocationStore(RevocationStore):
+    """
+    Process-local store. Only suitable for a single worker: other
+    processes never see its revocations.
+    """
+
+    def __init__(self):
+        self._expiry = {}
+
+    def _purge(self) -> None:
+        now = time.time()
+        for key in [key for key, expires in self._expiry.items() if expires <= now]:
+            del self._expiry[key]
+
+    async def revoke(self, token: str, expires_at: datetime) -> None:
+        self._purge()
+        self._expiry[token_key(token)] = expires_at.timestamp()
+
+    async def is_revoked(self, token: str) -> bool:
+        expires = self._expiry.get(token_key(token))
+        return expires is not None and expires > time.time()
+
+
+class BloomFilter:
+    """Fixed-size bloom filter over hex digests"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        # Double hashing over two 64-bit halves of a fresh digest of the key
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "big"), int.from_bytes(digest[8:], "big") | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class MongoRevocationStore(RevocationStore):
+    """
+    Revocations shared by every worker through a MongoDB collection whose
+    TTL index drops each entry at the token's own `exp`.
+
+    A local bloom filter answers the common "not revoked" case without I/O.
+    It pulls revocations made by other workers at most every `sync_seconds`,
+    which bounds how long a token revoked elsewhere keeps working here, and
+    is rebuilt from scratch every `rebuild_seconds` (or when full) so expired
+    entries fall out of it. Bloom hits are confirmed against MongoDB.
+    """
+
+    def __init__(
+        self,
+        collection,
+        sync_seconds: float = 5,
+        rebuild_seconds: float = 3600,
+        capacity: int = 100_000,
+        error_rate: float = 0.001,
+    ):
+        self.collection = collection
+        self.sync_seconds = sync_seconds
+        self.rebuild_seconds = rebuild_seconds
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._synced_at: Optional[datetime] = None
+        self._next_sync = 0.0
+        self._next_rebuild = 0.0
+        self._lock = asyncio.Lock()
+
+    async def _sync(self) -> None:
+        if time.monotonic() < self._next_sync:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            if now < self._next_sync:
+                return
+            started = datetime.now(timezone.utc)
+            query = {"expires_at": {"$gt": started}}
+            if now >= self._next_rebuild or self._bloom.count >= self.capacity:
+                bloom = BloomFilter(self.capacity, self.error_rate)
+                self._next_rebuild = now + self.rebuild_seconds
+            else:
+                bloom = self._bloom
+                # Overlap the previous sync a little to absorb clock skew between workers
+                query["revoked_at"] = {"$gte": self._synced_at - timedelta(seconds=self.sync_seconds)}
+            async for entry in self.collection.find(query, {"_id": 1}):
+                bloom.add(entry["_id"])
+            self._bloom = bloom
+            self._synced_at = started
+            self._next_sync = now + self.sync_seconds
+
+    async def revoke(self, token: str, expires_at: datetime) -> None:
+        key = token_key(token)
+        await self.collection.update_one(
+            {"_id": key},
+            {"$set": {"expires_at": expires_at, "revoked_at": datetime.now(timezone.utc)}},
+            upsert=True,
+        )
+        self._bloom.add(key)
+
+    async def is_revoked(self, token: str) -> bool:
+        await self._sync()
+        key = token_key(token)
+        if key not in self._bloom:
+            return False
+        entry = await self.collection.find_one(
+            {"_id": key, "expires_at": {"$gt": datetime.now(timezone.utc)}},
+            {"_id": 1},
+        )
+        return entry is not None
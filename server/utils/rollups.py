@@ -0,0 +1,218 @@
+"""
+Materialized monthly expense totals, one document per (account_id, year, month)
+in the `monthly_rollups` collection.
+
+Expense writes keep the rollups up to date with `$inc`. The app builds them
+once at startup from the expenses that predate them; to repair them from
+the expenses collection, run from the server directory:
+
+    python -m utils.rollups rebuild [--account ACCOUNT_ID]
+    python -m utils.rollups check [--account ACCOUNT_ID]
+"""
+import argparse
+import asyncio
+import logging
+import sys
+from datetime import datetime, timezone
+from typing import Optional
+from pymongo import DeleteOne, ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError
+from configs.database import db
+
+logger = logging.getLogger(__name__)
+
+# Recorded in the migrations collection once existing expenses are rolled up
+BACKFILL_ID = "monthly_rollups"
+
+# Totals are floats accumulated with $inc, so allow for rounding drift
+TOTAL_TOLERANCE = 0.01
+
+
+def month_key(expense_date: datetime) -> tuple:
+    """(year, month) of an expense date, in UTC like MongoDB's $year/$month"""
+    if expense_date.tzinfo is not None:
+        expense_date = expense_date.astimezone(timezone.utc)
+    return expense_date.year, expense_date.month
+
+
+def _countable(expense: dict) -> bool:
+    return (
+        expense.get("account_id") is not None
+        and isinstance(expense.get("expense_date"), datetime)
+        and isinstance(expense.get("amount"), (int, float))
+    )
+
+
+def rollup_deltas(before: Optional[dict], after: Optional[dict]) -> dict:
+    """
+    Net (total, count) change per (account_id, year, month) when an expense
+    goes from `before` to `after`. Either side may be None for inserts and
+    deletes; soft-deleted expenses, and stored documents without the fields
+    a rollup needs, do not count.
+    """
+    deltas = {}
+    for expense, sign in ((before, -1), (after, 1)):
+        if not expense or expense.get("deleted") or not _countable(expense):
+            continue
+        key = (str(expense["account_id"]), *month_key(expense["expense_date"]))
+        total, count = deltas.get(key, (0, 0))
+        deltas[key] = (total + sign * expense["amount"], count + sign)
+    return {key: delta for key, delta in deltas.items() if delta != (0, 0)}
+
+
+def merge_deltas(into: dict, deltas: dict) -> dict:
+    """Add `deltas` into `into` so several expense writes share one bulk write"""
+    for key, (total, count) in deltas.items():
+        previous_total, previous_count = into.get(key, (0, 0))
+        into[key] = (previous_total + total, previous_count + count)
+    return into
+
+
+def rollup_updates(deltas: dict) -> list:
+    return [
+        UpdateOne(
+            {"account_id": account_id, "year": year, "month": month},
+            {"$inc": {"total": total, "count": count}},
+            upsert=True,
+        )
+        for (account_id, year, month), (total, count) in deltas.items()
+    ]
+
+
+async def apply_expense_change(before: Optional[dict], after: Optional[dict]) -> None:
+    """Apply the rollup change for a single expense write"""
+    await apply_deltas(rollup_deltas(before, after))
+
+
+async def apply_deltas(deltas: dict) -> None:
+    """Apply pre-merged rollup deltas in one bulk write"""
+    if deltas:
+        await db.monthly_rollups.bulk_write(rollup_updates(deltas), ordered=False)
+
+
+async def get_monthly_rollups(account_id: str, year: Optional[int] = None) -> list:
+    query = {"account_id": account_id, "count": {"$gt": 0}}
+    if year is not None:
+        query["year"] = year
+    cursor = db.monthly_rollups.find(
+        query,
+        {"_id": 0, "year": 1, "month": 1, "total": 1, "count": 1},
+    ).sort([("year", 1), ("month", 1)])
+    return await cursor.to_list(None)
+
+
+def _aggregate_pipeline(account_id: Optional[str]) -> list:
+    match = {"deleted": False}
+    if account_id:
+        match["account_id"] = account_id
+    return [
+        {"$match": match},
+        {
+            "$group": {
+                "_id": {
+                    "account_id": "$account_id",
+                    "year": {"$year": "$expense_date"},
+                    "month": {"$month": "$expense_date"},
+                },
+                "total": {"$sum": "$amount"},
+                "count": {"$sum": 1},
+            }
+        },
+        {
+            "$project": {
+                "_id": 0,
+                "account_id": "$_id.account_id",
+                "year": "$_id.year",
+                "month": "$_id.month",
+                "total": 1,
+                "count": 1,
+            }
+        },
+    ]
+
+
+async def rebuild(account_id: Optional[str] = None) -> int:
+    """
+    Recompute rollups from the expenses collection, for one account or all.
+    Expense writes that land while this runs may need another rebuild.
+    """
+    scope = {"account_id": account_id} if account_id else {}
+    await db.monthly_rollups.delete_many(scope)
+    rows = await db.expenses.aggregate(_aggregate_pipeline(account_id)).to_list(None)
+    if rows:
+        await db.monthly_rollups.insert_many(rows, ordered=False)
+    return len(rows)
+
+
+async def backfill() -> int:
+    """
+    Build the rollups once from the existing expenses. Completion is kept
+    in the migrations collection, because writes served before this runs
+    $inc rollups into existence. Rows are replaced in place, so those
+    writes never meet an empty collection.
+    """
+    if await db.migrations.find_one({"_id": BACKFILL_ID}) is not None:
+        return 0
+    rows = await db.expenses.aggregate(_aggregate_pipeline(None)).to_list(None)
+    keys = {(row["account_id"], row["year"], row["month"]) for row in rows}
+    requests = [
+        ReplaceOne({"account_id": row["account_id"], "year": row["year"], "month": row["month"]}, row, upsert=True)
+        for row in rows
+    ]
+    # Months whose only rollup came from a delete of an older expense
+    async for rollup in db.monthly_rollups.find({}, {"account_id": 1, "year": 1, "month": 1}):
+        if (rollup["account_id"], rollup["year"], rollup["month"]) not in keys:
+            requests.append(DeleteOne({"_id": rollup["_id"]}))
+    if requests:
+        try:
+            await db.monthly_rollups.bulk_write(requests, ordered=False)
+        except BulkWriteError as e:
+            if any(error["code"] != 11000 for error in e.details.get("writeErrors", [])):
+                raise
+    await db.migrations.update_one({"_id": BACKFILL_ID}, {"$set": {"rollups": len(rows)}}, upsert=True)
+    logger.info("Backfilled %d monthly rollups", len(rows))
+    return len(rows)
+
+
+async def check(account_id: Optional[str] = None) -> list:
+    """Return the (account_id, year, month) keys whose rollup disagrees with the expenses"""
+    expected = {
+        (row["account_id"], row["year"], row["month"]): row
+        for row in await db.expenses.aggregate(_aggregate_pipeline(account_id)).to_list(None)
+    }
+    scope = {"account_id": account_id} if account_id else {}
+    actual = {
+        (row["account_id"], row["year"], row["month"]): row
+        async for row in db.monthly_rollups.find(scope, {"_id": 0})
+    }
+
+    mismatches = []
+    for key in expected.keys() | actual.keys():
+        want = expected.get(key, {"total": 0, "count": 0})
+        have = actual.get(key, {"total": 0, "count": 0})
+        if want["count"] != have["count"] or abs(want["total"] - have["total"]) > TOTAL_TOLERANCE:
+            mismatches.append(key)
+    return sorted(mismatches)
+
+
+async def main(args) -> int:
+    if args.command == "rebuild":
+        count = await rebuild(args.account)
+        print(f"✅ Rebuilt {count} monthly rollups.")
+        return 0
+
+    mismatches = await check(args.account)
+    for account_id, year, month in mismatches:
+        print(f"❌ {account_id} {year}-{month:02d}")
+    if mismatches:
+        print(f"{len(mismatches)} monthly rollups are inconsistent, run `rebuild` to repair them.")
+        return 1
+    print("✅ Monthly rollups are consistent.")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain the monthly_rollups collection")
+    parser.add_argument("command", choices=["rebuild", "check"])
+    parser.add_argument("--account", help="limit to one account id")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,121 @@
+"""
+Full-text expense search over the description and tag name.
+
+Every expense stores accent-folded copies of its description and tag name
+(`desc_terms`, `tag_terms`), covered by a text index whose account_id prefix
+keeps each search inside one account. Queries are folded the same way, so
+"an sang" finds "Ăn sáng". Expense writes keep the fields current, and the
+app fills them in once at startup for expenses written before they existed.
+To repair them, run from the server directory:
+
+    python -m utils.search reindex [--account ACCOUNT_ID]
+"""
+import argparse
+import asyncio
+import logging
+import sys
+import unicodedata
+from typing import Optional
+from pymongo import UpdateOne
+from configs.database import db
+from utils.pagination import SEARCH_SORT, decode_search_cursor
+from utils.tags import get_tags
+
+logger = logging.getLogger(__name__)
+
+# Recorded in the migrations collection once existing expenses are indexed
+BACKFILL_ID = "expense_search_fields"
+
+
+def normalize(text: Optional[str]) -> str:
+    """Lowercase, strip diacritics (including Vietnamese đ) and collapse whitespace"""
+    decomposed = unicodedata.normalize("NFD", text or "")
+    stripped = "".join(char for char in decomposed if unicodedata.category(char) != "Mn")
+    return " ".join(stripped.lower().replace("đ", "d").split())
+
+
+def search_fields(desc: Optional[str], tag_name: Optional[str]) -> dict:
+    """The indexed search fields of an expense"""
+    return {"desc_terms": normalize(desc), "tag_terms": normalize(tag_name)}
+
+
+def search_pipeline(query: dict, terms: str, limit: int, cursor: Optional[str] = None) -> list:
+    """
+    Aggregation returning one page of `query` matches for `terms`, best
+    text score first. `query` must pin account_id, the prefix of the text
+    index. Raises ValueError for a malformed cursor.
+    """
+    pipeline = [
+        {"$match": {**query, "$text": {"$search": terms}}},
+        {"$addFields": {"score": {"$meta": "textScore"}}},
+    ]
+    if cursor:
+        score, _id = decode_search_cursor(cursor)
+        pipeline.append({"$match": {"$or": [
+            {"score": {"$lt": score}},
+            {"score": score, "_id": {"$lt": _id}},
+        ]}})
+    pipeline += [{"$sort": SEARCH_SORT}, {"$limit": limit}]
+    return pipeline
+
+
+async def refresh_tag_terms(tag_id: str, account_id: str, name: str) -> None:
+    """Re-index the tag name of every expense carrying a renamed tag"""
+    await db.expenses.update_many(
+        {"account_id": account_id, "tagId": tag_id},
+        {"$set": {"tag_terms": normalize(name)}},
+    )
+
+
+async def reindex(account_id: Optional[str] = None, batch_size: int = 1000, query: Optional[dict] = None) -> int:
+    """Recompute the search fields of every expense (or one account's, or those matching `query`)"""
+    scope = {"account_id": account_id} if account_id else {}
+    scope.update(query or {})
+    updated = 0
+    batch = []
+
+    async def flush():
+        tags_by_id = await get_tags(expense.get("tagId") for expense in batch)
+        requests = []
+        for expense in batch:
+            tag = tags_by_id.get(expense.get("tagId"))
+            fields = search_fields(expense.get("desc"), tag["name"] if tag else None)
+            requests.append(UpdateOne({"_id": expense["_id"]}, {"$set": fields}))
+        await db.expenses.bulk_write(requests, ordered=False)
+        return len(requests)
+
+    async for expense in db.expenses.find(scope, {"desc": 1, "tagId": 1}):
+        batch.append(expense)
+        if len(batch) >= batch_size:
+            updated += await flush()
+            batch = []
+    if batch:
+        updated += await flush()
+    return updated
+
+
+async def backfill() -> int:
+    """
+    Index the expenses that have no search fields yet. Runs until it has
+    succeeded once; afterwards a marker document skips the collection scan.
+    """
+    if await db.migrations.find_one({"_id": BACKFILL_ID}) is not None:
+        return 0
+    updated = await reindex(query={"desc_terms": {"$exists": False}})
+    await db.migrations.update_one({"_id": BACKFILL_ID}, {"$set": {"updated": updated}}, upsert=True)
+    if updated:
+        logger.info("Backfilled search fields of %d expense(s)", updated)
+    return updated
+
+
+async def main(args) -> int:
+    updated = await reindex(args.account)
+    print(f"✅ Re-indexed {updated} expense(s).")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain the expense search fields")
+    parser.add_argument("command", choices=["reindex"])
+    parser.add_argument("--account", help="limit to one account id")
+    sys.exit(asyncio.run(main(parser.parse_args())))
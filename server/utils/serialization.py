@@ -0,0 +1,76 @@
+"""
+Fast JSON path for expense list endpoints. Motor documents are projected onto
+the ExpenseResponse / Tag fields and encoded with orjson directly, instead of
+validating every row through pydantic before serializing it.
+"""
+from datetime import datetime
+from typing import Iterable, Optional
+import orjson
+from bson import ObjectId
+from fastapi import Response
+from utils.pagination import NEXT_CURSOR_HEADER
+
+
+def _default(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def tag_to_json(tag: Optional[dict]) -> Optional[dict]:
+    """
+    A tag document shaped like the Tag response model. Tags created through
+    the API have no stored timestamps; they get the model's default_factory.
+    """
+    if tag is None:
+        return None
+    created_at = tag.get("created_at")
+    updated_at = tag.get("updated_at")
+    if created_at is None or updated_at is None:
+        now = datetime.now()
+        created_at = created_at or now
+        updated_at = updated_at or now
+    return {
+        "name": tag["name"],
+        "account_id": str(tag["account_id"]),
+        "created_at": created_at,
+        "updated_at": updated_at,
+        "deleted": tag.get("deleted", False),
+        "_id": str(tag["_id"]),
+        "color": tag.get("color"),
+    }
+
+
+def expense_to_json(expense: dict) -> dict:
+    """An expense document with `tag` attached, shaped like ExpenseResponse"""
+    return {
+        "amount": float(expense["amount"]),
+        "desc": expense.get("desc", ""),
+        "deleted": expense.get("deleted", False),
+        "expense_date": expense["expense_date"],
+        "_id": str(expense["_id"]),
+        "tag": tag_to_json(expense.get("tag")),
+    }
+
+
+def dump_expenses(expenses: Iterable[dict]) -> bytes:
+    return orjson.dumps([expense_to_json(expense) for expense in expenses], default=_default)
+
+
+class ExpenseListResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Iterable[dict]) -> bytes:
+        return dump_expenses(content)
+
+
+def expense_list_response(expenses: list, response: Optional[Response] = None) -> ExpenseListResponse:
+    """
+    Return a page of expenses as pre-serialized JSON. Returning a Response
+    skips FastAPI's response_model validation, so the pagination header set
+    on the injected `response` is carried over explicitly.
+    """
+    headers = None
+    if response is not None and NEXT_CURSOR_HEADER in response.headers:
+        headers = {NEXT_CURSOR_HEADER: response.headers[NEXT_CURSOR_HEADER]}
+    return ExpenseListResponse(expenses, headers=headers)
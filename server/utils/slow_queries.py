@@ -0,0 +1,164 @@
+"""
+Slow-query recorder: a PyMongo command listener that keeps recent MongoDB
+commands issued while serving a request and taking longer than a threshold,
+with their filter shape (values redacted), the route that issued them and
+an `explain("executionStats")` summary.
+"""
+import asyncio
+import contextvars
+import random
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from threading import Lock
+from typing import Optional
+from pymongo import monitoring
+from configs.indexes import plan_stages
+from utils.metrics import current_request
+
+# Commands that carry a query shape and can be explained
+EXPLAINABLE = {"find", "aggregate", "count", "distinct", "findAndModify", "update", "delete"}
+
+# Keys describing the query; everything else (session, cluster time, ...) is dropped
+SHAPE_KEYS = ("filter", "query", "sort", "projection", "pipeline", "updates", "deletes", "key")
+STRUCTURE_KEYS = {"sort", "projection"}
+# Lists whose every element is part of the shape (pipeline stages, bulk statements)
+SEQUENCE_KEYS = {"pipeline", "updates", "deletes"}
+
+
+def redact(value, key: Optional[str] = None):
+    """Replace literal values with '?' while keeping field names and operators"""
+    if key in STRUCTURE_KEYS:
+        return value
+    if isinstance(value, dict):
+        return {k: redact(v, k) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        if key in SEQUENCE_KEYS:
+            return [redact(v) for v in value]
+        return [redact(v) for v in value[:1]] + (["..."] if len(value) > 1 else [])
+    if isinstance(value, str) and value.startswith("$"):
+        # Field paths in aggregation expressions are structure, not data
+        return value
+    return "?"
+
+
+def query_shape(command: dict) -> dict:
+    return {key: redact(command[key], key) for key in SHAPE_KEYS if key in command}
+
+
+def _explain_summary(explain: dict) -> dict:
+    # aggregate explains nest the query planner under the first $cursor stage
+    if "queryPlanner" not in explain and explain.get("stages"):
+        explain = explain["stages"][0].get("$cursor", explain)
+    winning_plan = explain.get("queryPlanner", {}).get("winningPlan", {})
+    stats = explain.get("executionStats", {})
+    stages = [stage for stage in plan_stages(winning_plan) if stage]
+    return {
+        "stages": stages,
+        "collscan": "COLLSCAN" in stages,
+        "n_returned": stats.get("nReturned"),
+        "keys_examined": stats.get("totalKeysExamined"),
+        "docs_examined": stats.get("totalDocsExamined"),
+        "execution_ms": stats.get("executionTimeMillis"),
+    }
+
+
+class SlowQueryRecorder(monitoring.CommandListener):
+    def __init__(
+        self,
+        threshold_ms: float,
+        sample_rate: float = 1.0,
+        max_per_minute: int = 30,
+        explain: bool = True,
+        capacity: int = 200,
+    ):
+        self.threshold_ms = threshold_ms
+        self.sample_rate = sample_rate
+        self.max_per_minute = max_per_minute
+        self.explain = explain
+        self.entries = deque(maxlen=capacity)
+        self.dropped = 0
+        self._pending = OrderedDict()
+        self._lock = Lock()
+        self._window_start = 0.0
+        self._window_count = 0
+        self._client = None
+        self._loop = None
+
+    def attach(self, client, loop: asyncio.AbstractEventLoop) -> None:
+        """Enable explain capture using this client on this event loop"""
+        self._client = client
+        self._loop = loop
+
+    def _admit(self) -> bool:
+        """Sampling plus a fixed one-minute window rate limit"""
+        if random.random() >= self.sample_rate:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            if now - self._window_start >= 60:
+                self._window_start, self._window_count = now, 0
+            if self._window_count >= self.max_per_minute:
+                self.dropped += 1
+                return False
+            self._window_count += 1
+            return True
+
+    def started(self, event) -> None:
+        if event.command_name not in EXPLAINABLE:
+            return
+        stats = current_request.get()
+        if stats is None:
+            return  # not issued while serving a request
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (dict(event.command), stats.route)
+            while len(self._pending) > 1000:
+                self._pending.popitem(last=False)
+
+    def succeeded(self, event) -> None:
+        with self._lock:
+            pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending is None:
+            return
+        duration_ms = event.duration_micros / 1000
+        if duration_ms < self.threshold_ms or not self._admit():
+            return
+
+        command, route = pending
+        entry = {
+            "at": datetime.now(timezone.utc).isoformat(),
+            "route": route,
+            "command": event.command_name,
+            "database": event.database_name,
+            "collection": command.get(event.command_name),
+            "duration_ms": round(duration_ms, 2),
+            "shape": query_shape(command),
+            "explain": None,
+        }
+        self.entries.append(entry)
+        if self.explain and self._client is not None and self._loop is not None:
+            # Run in an empty context: a copy of the request's would count the
+            # explain against that request's metrics and Server-Timing
+            self._loop.call_soon_threadsafe(
+                lambda: contextvars.Context().run(asyncio.ensure_future, self._capture_explain(entry, command))
+            )
+
+    def failed(self, event) -> None:
+        with self._lock:
+            self._pending.pop((event.connection_id, event.request_id), None)
+
+    async def _capture_explain(self, entry: dict, command: dict) -> None:
+        explainable = {
+            key: value for key, value in command.items()
+            if not key.startswith("$") and key not in ("lsid", "txnNumber", "autocommit", "startTransaction")
+        }
+        try:
+            explain = await self._client[entry["database"]].command(
+                {"explain": explainable, "verbosity": "executionStats"}
+            )
+            entry["explain"] = _explain_summary(explain)
+        except Exception as e:
+            entry["explain"] = {"error": str(e)}
+
+    def recent(self, limit: int = 50) -> list:
+        return list(self.entries)[::-1][:limit]
@@ -0,0 +1,89 @@
+from typing import Iterable, List, Optional
+from bson import ObjectId
+from configs.config import settings
+from configs.database import db
+from utils.cache import TTLCache
+
+# Tags by id and tag lists by account. Both are refreshed on tag writes in
+# this process; reads behind an ETag pass the account's data version, so a
+# tag write through any worker makes them miss everywhere.
+tag_cache = TTLCache(
+    maxsize=settings.TAG_CACHE_SIZE,
+    ttl=settings.TAG_CACHE_TTL_SECONDS,
+    name="tags",
+)
+account_tags_cache = TTLCache(
+    maxsize=settings.TAG_CACHE_SIZE,
+    ttl=settings.TAG_CACHE_TTL_SECONDS,
+    name="account_tags",
+)
+
+
+def _key(key: str, version: Optional[str]) -> str:
+    return f"{key}@{version}" if version else key
+
+
+async def get_tags(tag_ids: Iterable[str], version: Optional[str] = None) -> dict:
+    """
+    Return a mapping of tag id to tag document, reading through the cache
+    and loading every miss with a single `$in` query. With the owning
+    account's data version, entries cached under an older version miss.
+    """
+    tags_by_id = {}
+    missing = []
+    for tag_id in {str(tag_id) for tag_id in tag_ids if tag_id}:
+        tag = tag_cache.get(_key(tag_id, version))
+        if tag is not None:
+            tags_by_id[tag_id] = tag
+        elif ObjectId.is_valid(tag_id):
+            missing.append(ObjectId(tag_id))
+
+    if missing:
+        async for tag in db.tags.find({"_id": {"$in": missing}}):
+            tag_id = str(tag["_id"])
+            tag_cache.set(_key(tag_id, version), tag)
+            tags_by_id[tag_id] = tag
+
+    return tags_by_id
+
+
+async def get_tag(tag_id: str) -> Optional[dict]:
+    """Return a single tag document, or None if it does not exist."""
+    return (await get_tags([tag_id])).get(str(tag_id))
+
+
+async def get_account_tags(account_id: str, length: int = 100, version: Optional[str] = None) -> List[dict]:
+    """Return the tags owned by an account, reading through the cache (see get_tags for `version`)."""
+    tags = account_tags_cache.get(_key(account_id, version))
+    if tags is None:
+        tags = await db.tags.find({"account_id": account_id}).to_list(length)
+        account_tags_cache.set(_key(account_id, version), tags)
+        for tag in tags:
+            tag_cache.set(_key(str(tag["_id"]), version), tag)
+    return list(tags[:length])
+
+
+def invalidate_tag(tag_id: Optional[str], account_id: Optional[str] = None) -> None:
+    """Drop a tag and its owner's tag list after a write."""
+    if tag_id:
+        tag_cache.delete(str(tag_id))
+    if account_id:
+        account_tags_cache.delete(str(account_id))
+
+
+def cache_stats() -> List[dict]:
+    return [tag_cache.stats(), account_tags_cache.stats()]
+
+
+async def attach_tags(expenses: list, version: Optional[str] = None) -> list:
+    """
+    Replace each expense's `tagId` with its tag document, resolving
+    every tag referenced by the page in a single `$in` query.
+    """
+    tags_by_id = await get_tags((expense.get("tagId") for expense in expenses), version)
+
+    for expense in expenses:
+        tag_id = expense.pop("tagId", None)
+        expense["tag"] = tags_by_id.get(str(tag_id)) if tag_id else None
+
+    return expenses